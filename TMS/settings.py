@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -76,10 +78,92 @@ WSGI_APPLICATION = "TMS.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        # TMS_DATABASE_NAME points the app at another SQLite file, e.g. the
+        # generated dataset used by `manage.py loadtest`.
+        "NAME": os.environ.get("TMS_DATABASE_NAME", BASE_DIR / "db.sqlite3"),
     }
 }
 
+# Read replica for reporting and admin reads. Set TMS_REPLICA_DATABASE to the
+# path of a second SQLite file (kept in sync with `manage.py sync_replica`) or
+# replace this entry with a real replica of the primary.
+if os.environ.get("TMS_REPLICA_DATABASE"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["TMS_REPLICA_DATABASE"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+# Database alias and apps whose read-only traffic may be served by the replica.
+TMS_REPLICA_ALIAS = "replica"
+TMS_REPLICA_APPS = ["core"]
+# Fall back to the primary when the replica lags by more than this many seconds.
+TMS_REPLICA_MAX_LAG_SECONDS = 30
+# How often the replica lag is re-checked, in seconds.
+TMS_REPLICA_LAG_CHECK_SECONDS = 5
+# After a write, the session reads from the primary for this many seconds.
+TMS_REPLICA_PIN_SECONDS = 60
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set TMS_CACHE_LOCATION to a directory to share a
+# file-based cache between worker processes.
+
+if os.environ.get("TMS_CACHE_LOCATION"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["TMS_CACHE_LOCATION"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Sessions and authentication
+# Sessions are read from the cache and only written when modified. When the
+# cache is shared between processes (file-based via TMS_CACHE_LOCATION), users
+# and permissions are cached by core.backends.CachedModelBackend and
+# invalidated by core.signals when they change.
+
+SESSION_ENGINE = os.environ.get("TMS_SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+SESSION_SAVE_EVERY_REQUEST = False
+
+AUTHENTICATION_BACKENDS = ["core.backends.CachedModelBackend"]
+TMS_AUTH_CACHE_TIMEOUT = 300
+
+
+# The mark-entry grid posts one field per student.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 5000
+
+# Change feed: records modified within this many seconds are held back so that
+# late-committing transactions are not skipped by consumers' cursors.
+TMS_CHANGE_FEED_SAFETY_SECONDS = 2
+
+# Background jobs (see core.jobs): at most this many jobs of a kind run at once
+# across all `run_jobs` workers; other kinds are unlimited.
+TMS_JOB_CONCURRENCY = {
+    "export_csv": 2,
+    "exam_statistics": 1,
+    "sync_roster": 1,
+}
+# A failed job is retried after this many seconds, doubling on each attempt.
+TMS_JOB_RETRY_BACKOFF_SECONDS = 10
+# Running jobs without a heartbeat for this long are requeued when a worker starts;
+# keep it well above run_jobs --heartbeat-interval.
+TMS_JOB_STALE_SECONDS = 600
+
+# Admin dashboard fragments are cached for at most this many seconds; model
+# saves and deletes invalidate them sooner (see core.dashboard).
+TMS_DASHBOARD_CACHE_SECONDS = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -117,6 +201,10 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded and generated files; job results are served through the admin only.
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "media/"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,6 +1,27 @@
+import copy
+import csv
+
 from django.contrib import admin
+from django.contrib.admin.options import IS_POPUP_VAR, TO_FIELD_VAR
+from django.contrib.admin.utils import NestedObjects, quote, unquote
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import RelatedFieldWidgetWrapper
 from django import forms
-from .models import Student, Course, CourseEnrolment, Exam
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.db import router
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.text import capfirst
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from .models import (
+    Student, Course, CourseEnrolment, Exam, Job, ENROLMENT_STATUS_CHOICES, ACTIVE_STATUS_CHOICES, EXAM_TYPE_CHOICES,
+)
+from . import jobs, marks, statistics
+from .cohorts import enrol_cohort
+from .routers import replica_read_view, replica_reads
 
 
 class ExamForm(forms.ModelForm):
@@ -15,8 +36,276 @@ class ExamForm(forms.ModelForm):
             self.fields['course_enrolment'].queryset = CourseEnrolment.objects.filter(active_status='Active')
 
 
+class ReplicaReadAdminMixin:
+    """
+    Serves changelist pages and CSV exports from the read replica when one is
+    configured (see core.routers).
+    """
+    actions = ['export_as_csv', 'export_as_csv_in_background']
+
+    @replica_read_view
+    def changelist_view(self, request, extra_context=None):
+        return super().changelist_view(request, extra_context)
+
+    @admin.action(description="Export selected %(verbose_name_plural)s as CSV")
+    def export_as_csv(self, request, queryset):
+        """Export all model fields of the selected records as a CSV file"""
+        fields = [field.attname for field in self.model._meta.concrete_fields]
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{self.model._meta.model_name}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(fields)
+        with replica_reads(request):
+            writer.writerows(queryset.values_list(*fields).iterator(chunk_size=2000))
+        return response
+
+    @admin.action(description="Export selected %(verbose_name_plural)s as CSV in the background")
+    def export_as_csv_in_background(self, request, queryset):
+        """Queue the CSV export as a job, for selections too large to export within a request"""
+        payload = {'model': self.model._meta.model_name}
+        with replica_reads(request):
+            if request.POST.get('select_across') == '1':
+                # "Select all" can cover the whole table, so the job reapplies
+                # the changelist's filters instead of storing every primary key.
+                count = queryset.count()
+                if request.GET:
+                    payload['changelist_filters'] = request.GET.urlencode()
+            else:
+                payload['pks'] = list(queryset.values_list('pk', flat=True))
+                count = len(payload['pks'])
+        job = jobs.enqueue('export_csv', payload, user=request.user)
+        self.message_user(
+            request,
+            f"Queued the export of {count} {self.model._meta.verbose_name_plural} as job #{job.pk}; "
+            "download it from Jobs once it has finished.",
+            messages.SUCCESS,
+        )
+        return HttpResponseRedirect(reverse('admin:core_job_change', args=[job.pk]))
+
+
+class CohortEnrolmentForm(forms.Form):
+    """Shared enrolment details for the 'Enrol selected students in a course' action"""
+    course = forms.ModelChoiceField(queryset=Course.objects.order_by('course_name'))
+    enrolment_date = forms.DateField(initial=timezone.localdate, widget=forms.DateInput(attrs={'type': 'date'}))
+    deadline = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    status = forms.ChoiceField(choices=ENROLMENT_STATUS_CHOICES)
+    active_status = forms.ChoiceField(choices=ACTIVE_STATUS_CHOICES, initial='Active')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('deadline') and cleaned_data.get('enrolment_date'):
+            if cleaned_data['deadline'] < cleaned_data['enrolment_date']:
+                self.add_error('deadline', "The deadline cannot be before the enrolment date.")
+        return cleaned_data
+
+
+class MarkEntrySelectionForm(forms.Form):
+    """Picks the assessment whose marks are entered in the mark-entry grid"""
+    course = forms.ModelChoiceField(
+        queryset=Course.objects.order_by('course_name'), to_field_name='serial_number'
+    )
+    exam_type = forms.ChoiceField(choices=EXAM_TYPE_CHOICES)
+    exam_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    total_marks = forms.DecimalField(max_digits=5, decimal_places=2, min_value=0.01)
+
+
+class MarkEntryGridForm(forms.Form):
+    """
+    One obtained-marks field per mark sheet row, validated together against the
+    obtained_lte_total_marks constraint before anything is saved.
+    """
+
+    def __init__(self, *args, rows, total_marks, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = rows
+        self.total_marks = total_marks
+        for row in rows:
+            self.fields[self.field_name(row)] = forms.DecimalField(
+                max_digits=5, decimal_places=2, min_value=0, required=False,
+                label=row.enrolment.student.name,
+                initial=row.exam.obtained_marks if row.exam else None,
+                widget=forms.NumberInput(attrs={'step': '0.01', 'style': 'width: 6em'}),
+            )
+
+    @staticmethod
+    def field_name(row):
+        return f"marks_{row.enrolment.pk}"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for row in self.rows:
+            obtained = cleaned_data.get(self.field_name(row))
+            if obtained is not None and obtained > self.total_marks:
+                self.add_error(
+                    self.field_name(row),
+                    f"Obtained marks cannot exceed the total marks ({self.total_marks}).",
+                )
+        return cleaned_data
+
+    def grid(self):
+        """(row, bound field) pairs for the template"""
+        return [(row, self[self.field_name(row)]) for row in self.rows]
+
+    def marks(self):
+        return {row.enrolment.pk: self.cleaned_data.get(self.field_name(row)) for row in self.rows}
+
+
+class SerialNumberChangeList(ChangeList):
+    """Links changelist rows by serial number instead of the integer primary key"""
+
+    def url_for_result(self, result):
+        return reverse(
+            f"admin:{self.opts.app_label}_{self.opts.model_name}_change",
+            args=(object_url_key(result),),
+            current_app=self.model_admin.admin_site.name,
+        )
+
+
+def object_url_key(obj):
+    """The id of ``obj`` in admin URLs: its serial number for models that have one"""
+    return quote(getattr(obj, 'serial_number', None) or obj.pk)
+
+
+class SerialNumberRelatedFieldWidgetWrapper(RelatedFieldWidgetWrapper):
+    """
+    The change and delete links next to a foreign key select are filled in
+    with the selected primary key by the admin's JavaScript, so they go through
+    the serial-number admin's primary key redirect.
+    """
+
+    def get_related_url(self, info, action, *args):
+        if action in ('change', 'delete'):
+            return reverse(
+                "admin:%s_%s_by_id" % info,
+                current_app=self.admin_site.name,
+                args=(*args, action),
+            )
+        return super().get_related_url(info, action, *args)
+
+
+class SerialNumberAdminMixin:
+    """
+    Keeps admin URLs keyed by the business serial number: change, history and
+    delete URLs take the serial number only, never the integer primary key, so
+    numeric serial numbers cannot be mistaken for primary keys. Links that only
+    know the primary key (admin log entries, foreign key widgets) use the
+    distinct ``id/<pk>/<action>/`` route, which redirects to the serial number.
+    """
+
+    def get_changelist(self, request, **kwargs):
+        return SerialNumberChangeList
+
+    def get_object(self, request, object_id, from_field=None):
+        # history_view() alone looks objects up by primary key.
+        if from_field is None:
+            from_field = getattr(request, 'object_lookup_field', 'serial_number')
+        return super().get_object(request, object_id, from_field)
+
+    def get_urls(self):
+        urls = [
+            path(
+                'id/<str:object_pk>/<str:action>/',
+                self.admin_site.admin_view(self.primary_key_redirect_view),
+                name=f"{self.opts.app_label}_{self.opts.model_name}_by_id",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def primary_key_redirect_view(self, request, object_pk, action):
+        """Redirects a primary key link to the object's serial number URL"""
+        if action not in ('change', 'history', 'delete') or not object_pk.isdigit():
+            raise Http404
+        obj = self.get_queryset(request).filter(pk=object_pk).first()
+        if obj is None:
+            raise Http404(f"No {self.opts.verbose_name} with ID {object_pk}.")
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        url = reverse(
+            f"admin:{self.opts.app_label}_{self.opts.model_name}_{action}",
+            args=(object_url_key(obj),),
+            current_app=self.admin_site.name,
+        )
+        query = request.GET.copy()
+        # The target URL holds the serial number, so it cannot be read as the
+        # primary key; popups return the primary key by default anyway.
+        if query.get(TO_FIELD_VAR) == self.opts.pk.attname:
+            del query[TO_FIELD_VAR]
+        if query:
+            url = f"{url}?{query.urlencode()}"
+        return HttpResponseRedirect(url)
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_dbfield(db_field, request, **kwargs)
+        widget = getattr(formfield, 'widget', None)
+        if (
+            isinstance(widget, RelatedFieldWidgetWrapper)
+            and isinstance(self.admin_site.get_model_admin(db_field.remote_field.model), SerialNumberAdminMixin)
+        ):
+            formfield.widget = SerialNumberRelatedFieldWidgetWrapper(
+                widget.widget,
+                widget.rel,
+                widget.admin_site,
+                can_add_related=widget.can_add_related,
+                can_change_related=widget.can_change_related,
+                can_delete_related=widget.can_delete_related,
+                can_view_related=widget.can_view_related,
+            )
+        return formfield
+
+    def response_add(self, request, obj, post_url_continue=None):
+        if IS_POPUP_VAR not in request.POST:
+            # The stock response links the new object by obj.pk; hand it a copy
+            # whose pk is the serial number so the link and redirect use it.
+            obj = copy.copy(obj)
+            obj.pk = obj.serial_number
+        return super().response_add(request, obj, post_url_continue)
+
+    def get_deleted_objects(self, objs, request):
+        """
+        Like the stock version, but linking serial-numbered objects by serial
+        number. admin.utils.get_deleted_objects() builds its links from obj.pk
+        in a callback it does not expose, so the collection is repeated here.
+        """
+        try:
+            using = router.db_for_write(objs[0]._meta.model)
+        except IndexError:
+            return [], {}, set(), []
+        collector = NestedObjects(using=using, origin=objs)
+        collector.collect(objs)
+        perms_needed = set()
+
+        def format_callback(obj):
+            opts = obj._meta
+            if not self.admin_site.is_registered(obj.__class__):
+                return f"{capfirst(opts.verbose_name)}: {obj}"
+            if not self.admin_site.get_model_admin(obj.__class__).has_delete_permission(request, obj):
+                perms_needed.add(opts.verbose_name)
+            admin_url = reverse(
+                f"{self.admin_site.name}:{opts.app_label}_{opts.model_name}_change",
+                args=(object_url_key(obj),),
+            )
+            return format_html('{}: <a href="{}">{}</a>', capfirst(opts.verbose_name), admin_url, obj)
+
+        to_delete = collector.nested(format_callback)
+        protected = [format_callback(obj) for obj in collector.protected]
+        model_count = {
+            model._meta.verbose_name_plural: len(model_objs)
+            for model, model_objs in collector.model_objs.items()
+        }
+        return to_delete, model_count, perms_needed, protected
+
+    def history_view(self, request, object_id, extra_context=None):
+        # Log entries record the integer primary key, and the stock view looks
+        # them up by the object id it is given, so it gets the primary key.
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(request, self.opts, object_id)
+        request.object_lookup_field = self.opts.pk.attname
+        return super().history_view(request, str(obj.pk), extra_context)
+
+
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(SerialNumberAdminMixin, ReplicaReadAdminMixin, admin.ModelAdmin):
     list_display = ('serial_number', 'name', 'father_name', 'cnic', 'email', 'contact_number', 'joining_date', 'status')
     list_filter = ('status', 'joining_date', 'resignation_date')
     search_fields = ('serial_number', 'name', 'father_name', 'cnic', 'email', 'contact_number')
@@ -32,6 +321,7 @@ class StudentAdmin(admin.ModelAdmin):
             'fields': ('joining_date', 'resignation_date', 'status')
         }),
     )
+    actions = [*ReplicaReadAdminMixin.actions, 'enrol_in_course']
 
     def save_model(self, request, obj, form, change):
         """Auto-generate serial number if not provided"""
@@ -41,9 +331,45 @@ class StudentAdmin(admin.ModelAdmin):
             obj.serial_number = f"STU{uuid.uuid4().hex[:6].upper()}"
         super().save_model(request, obj, form, change)
 
+    def has_add_enrolment_permission(self, request):
+        return request.user.has_perm('core.add_courseenrolment')
+
+    @admin.action(description="Enrol selected students in a course", permissions=['add_enrolment'])
+    def enrol_in_course(self, request, queryset):
+        """Enrol the selected students in one course with shared dates and status"""
+        if not self.has_add_enrolment_permission(request):
+            raise PermissionDenied
+        if 'apply' in request.POST:
+            form = CohortEnrolmentForm(request.POST)
+            if form.is_valid():
+                data = form.cleaned_data
+                result = enrol_cohort(
+                    queryset, data['course'], data['enrolment_date'], data['deadline'],
+                    data['status'], data['active_status'],
+                )
+                self.message_user(
+                    request,
+                    f"Enrolled {len(result.created)} students in {data['course']}; "
+                    f"skipped {len(result.skipped)} already enrolled.",
+                    messages.SUCCESS,
+                )
+                return None
+        else:
+            form = CohortEnrolmentForm()
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Enrol students in a course",
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+            'select_across': request.POST.get('select_across', '0'),
+        }
+        return TemplateResponse(request, 'admin/core/student/enrol_cohort.html', context)
+
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(SerialNumberAdminMixin, ReplicaReadAdminMixin, admin.ModelAdmin):
     list_display = ('serial_number', 'course_name', 'course_duration_hours', 'course_head', 'course_link')
     list_filter = ('course_duration_hours', 'course_head')
     search_fields = ('serial_number', 'course_name', 'course_head__name')
@@ -67,7 +393,7 @@ class CourseAdmin(admin.ModelAdmin):
 
 
 @admin.register(CourseEnrolment)
-class CourseEnrolmentAdmin(admin.ModelAdmin):
+class CourseEnrolmentAdmin(SerialNumberAdminMixin, ReplicaReadAdminMixin, admin.ModelAdmin):
     list_display = ('serial_number', 'student', 'course', 'enrolment_date', 'deadline', 'completion_date', 'status', 'active_status', 'extra_time_display')
     list_filter = ('status', 'active_status', 'enrolment_date', 'deadline', 'completion_date', 'course', 'student')
     search_fields = ('serial_number', 'student__name', 'course__course_name')
@@ -111,8 +437,9 @@ class CourseEnrolmentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Exam)
-class ExamAdmin(admin.ModelAdmin):
+class ExamAdmin(SerialNumberAdminMixin, ReplicaReadAdminMixin, admin.ModelAdmin):
     form = ExamForm
+    change_list_template = 'admin/core/exam/change_list.html'
     list_display = ('serial_number', 'course_enrolment', 'exam_type', 'exam_date', 'total_marks', 'obtained_marks', 'active_status', 'result_in_percentage_display')
     list_filter = ('exam_type', 'active_status', 'exam_date', 'course_enrolment__course', 'course_enrolment__student')
     search_fields = ('serial_number', 'course_enrolment__student__name', 'course_enrolment__course__course_name')
@@ -142,8 +469,196 @@ class ExamAdmin(admin.ModelAdmin):
         return f"{obj.result_in_percentage:.2f}%"
     result_in_percentage_display.short_description = "Result (%)"
 
+    def get_urls(self):
+        urls = [
+            path(
+                'statistics/',
+                self.admin_site.admin_view(self.statistics_view),
+                name='core_exam_statistics',
+            ),
+            path(
+                'mark-entry/',
+                self.admin_site.admin_view(self.mark_entry_view),
+                name='core_exam_mark_entry',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    @replica_read_view
+    def statistics_view(self, request):
+        """Grade distribution report, overall or for a single course"""
+        if not request.user.has_perm('core.view_exam'):
+            raise PermissionDenied
+        queryset = Exam.objects.filter(active_status='Active', course_enrolment__active_status='Active')
+        course = None
+        course_id = request.GET.get('course')
+        if course_id:
+            course = Course.objects.filter(serial_number=course_id).first()
+            if course is not None:
+                queryset = queryset.filter(course_enrolment__course=course)
+        if request.method == 'POST':
+            # Rebuild the report as a downloadable JSON file in the background.
+            job = jobs.enqueue(
+                'exam_statistics', {'course': course.serial_number if course else None}, user=request.user,
+            )
+            self.message_user(request, f"Queued the statistics report as job #{job.pk}.", messages.SUCCESS)
+            return HttpResponseRedirect(reverse('admin:core_job_change', args=[job.pk]))
+        columns = statistics.exam_columns(queryset)
+        summary = statistics.summarize(columns)
+        per_course = statistics.statistics_by_course(columns=columns)
+        courses = Course.objects.in_bulk(list(per_course))
+        histogram = summary['histogram']
+        context = {
+            **self.admin_site.each_context(request),
+            'title': f"Exam statistics: {course}" if course else "Exam statistics",
+            'opts': self.model._meta,
+            'course': course,
+            'summary': summary,
+            'histogram_rows': [
+                (histogram['edges'][i], histogram['edges'][i + 1], count)
+                for i, count in enumerate(histogram['counts'])
+            ],
+            'course_rows': [
+                (courses[pk], stats)
+                for pk, stats in sorted(per_course.items())
+                if pk in courses
+            ],
+            'pass_percentage': statistics.PASS_PERCENTAGE,
+        }
+        return TemplateResponse(request, 'admin/core/exam/statistics.html', context)
+
+
+    def mark_entry_view(self, request):
+        """
+        Spreadsheet-style entry of obtained marks for a whole class. Read from
+        the primary, not the replica: the form's initial marks are what a save
+        overwrites.
+        """
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Enter marks",
+            'opts': self.model._meta,
+        }
+        selection = MarkEntrySelectionForm(request.GET or None)
+        context['selection'] = selection
+        if not selection.is_valid():
+            return TemplateResponse(request, 'admin/core/exam/mark_entry.html', context)
+
+        assessment = selection.cleaned_data
+        rows = marks.load_mark_sheet(assessment['course'], assessment['exam_type'], assessment['exam_date'])
+        grid = MarkEntryGridForm(
+            request.POST if request.method == 'POST' else None,
+            rows=rows,
+            total_marks=assessment['total_marks'],
+        )
+        if request.method == 'POST' and grid.is_valid():
+            created, updated = marks.save_marks(
+                rows, grid.marks(), assessment['total_marks'], assessment['exam_type'], assessment['exam_date'],
+            )
+            self.message_user(
+                request,
+                f"Saved marks for {assessment['course']}: {created} exams created, {updated} updated.",
+                messages.SUCCESS,
+            )
+            return HttpResponseRedirect(request.get_full_path())
+        context.update({
+            'title': f"Enter marks: {assessment['course']}",
+            'assessment': assessment,
+            'grid': grid,
+        })
+        return TemplateResponse(request, 'admin/core/exam/mark_entry.html', context)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'priority', 'progress_display', 'attempts', 'created_by', 'created_at', 'finished_at', 'download_link')
+    list_filter = ('status', 'kind', 'created_at')
+    search_fields = ('kind', 'progress_message', 'worker')
+    list_select_related = ('created_by',)
+    actions = ['cancel_jobs', 'retry_jobs']
+    fieldsets = (
+        ('Job', {
+            'fields': ('kind', 'payload', 'priority', 'status', 'created_by', 'created_at')
+        }),
+        ('Progress', {
+            'fields': ('progress_display', 'progress_message', 'attempts', 'max_attempts', 'worker', 'run_after', 'started_at', 'heartbeat_at', 'finished_at')
+        }),
+        ('Result', {
+            'fields': ('download_link', 'error')
+        }),
+    )
+    readonly_fields = (
+        'kind', 'payload', 'status', 'created_by', 'created_at', 'progress_display', 'progress_message', 'attempts',
+        'worker', 'started_at', 'heartbeat_at', 'finished_at', 'download_link', 'error',
+    )
+
+    def has_add_permission(self, request):
+        # Jobs are queued by admin actions and code, not entered by hand.
+        return False
+
+    def progress_display(self, obj):
+        """Display progress as a bar with the work done"""
+        percentage = obj.progress_percentage
+        if percentage is None:
+            return obj.progress_done or "-"
+        return format_html(
+            '<progress value="{}" max="100"></progress> {}%',
+            f"{percentage:.0f}", f"{percentage:.0f}",
+        )
+    progress_display.short_description = "Progress"
+
+    def download_link(self, obj):
+        """Link to the job's result file"""
+        if not obj.result_file:
+            return "-"
+        return format_html(
+            '<a href="{}">Download</a>', reverse('admin:core_job_download', args=[obj.pk])
+        )
+    download_link.short_description = "Result"
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:object_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='core_job_download',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def has_download_permission(self, request, obj):
+        # Results can hold exported records, so only the user who queued the job may download them.
+        return request.user.is_superuser or (obj.created_by_id is not None and obj.created_by_id == request.user.pk)
+
+    def download_view(self, request, object_id):
+        """Serve a job's result file to the user who queued the job and to superusers"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        job = self.get_object(request, str(object_id))
+        if job is None or not job.result_file:
+            raise Http404("This job has no result to download.")
+        if not self.has_download_permission(request, job):
+            raise PermissionDenied
+        return FileResponse(job.result_file.open('rb'), as_attachment=True, filename=job.result_file.name.split('/')[-1])
+
+    @admin.action(description="Cancel selected queued jobs")
+    def cancel_jobs(self, request, queryset):
+        cancelled = queryset.filter(status='Queued').update(status='Cancelled', finished_at=timezone.now())
+        self.message_user(request, f"Cancelled {cancelled} queued jobs.", messages.SUCCESS)
+
+    @admin.action(description="Retry selected failed or cancelled jobs")
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status__in=['Failed', 'Cancelled']).update(
+            status='Queued', attempts=0, error='', finished_at=None, run_after=timezone.now(),
+        )
+        self.message_user(request, f"Requeued {retried} jobs.", messages.SUCCESS)
+
 
 # Customize admin site headers
 admin.site.site_header = "TMS Administration"
 admin.site.site_title = "TMS Admin"
-admin.site.index_title = "Welcome to TMS Administration"
\ No newline at end of file
+admin.site.index_title = "Welcome to TMS Administration"
+# Adds the cached dashboard (see core.dashboard) above the model links
+admin.site.index_template = "admin/core/index.html"
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Authentication backend that caches users and their permissions.
+
+Every admin request loads the logged-in user and, for staff users, their
+permissions. CachedModelBackend keeps both in the default cache until a
+change to the user, their groups or permissions invalidates them (see
+core.signals).
+
+Invalidation only reaches the cache of the process that made the change, so
+nothing is cached unless the default cache is shared between processes.
+Otherwise a deactivated user, a changed password or a revoked permission
+would keep working in the other server processes until the cache timed out.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+# Cache backends that keep a separate cache in every process.
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Bumped whenever group or permission assignments change, invalidating every
+# cached permission set at once.
+PERMISSIONS_VERSION_KEY = 'tms:auth:permissions-version'
+
+
+def _timeout():
+    return getattr(settings, 'TMS_AUTH_CACHE_TIMEOUT', 300)
+
+
+def caches_auth():
+    """Whether users and permissions may be cached, i.e. whether the default cache is shared between processes"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def user_cache_key(user_id):
+    return f"tms:auth:user:{user_id}"
+
+
+def permissions_cache_key(user_id):
+    version = cache.get_or_set(PERMISSIONS_VERSION_KEY, 1, None)
+    return f"tms:auth:perms:{version}:{user_id}"
+
+
+def invalidate_user(user_id):
+    """Drops the cached user and permissions for ``user_id``"""
+    cache.delete_many([user_cache_key(user_id), permissions_cache_key(user_id)])
+
+
+def invalidate_permissions():
+    """Drops every cached permission set"""
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        cache.set(PERMISSIONS_VERSION_KEY, 1, None)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that serves get_user() and get_all_permissions() from the
+    cache when the cache is shared between processes.
+    """
+
+    def get_user(self, user_id):
+        if not caches_auth():
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, _timeout())
+        elif not self.user_can_authenticate(user):
+            return None
+        return user
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not caches_auth():
+            return super().get_all_permissions(user_obj, obj)
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = permissions_cache_key(user_obj.pk)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, _timeout())
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
@@ -0,0 +1,56 @@
+"""
+Bulk cohort enrolment.
+
+Enrolling a cohort one CourseEnrolmentAdmin.save_model call at a time costs one
+round trip per student and fails on duplicates. enrol_cohort() creates all the
+enrolments in a handful of queries: one for the cohort, one for the course's
+existing enrolments, and one batched insert per BATCH_SIZE new rows.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .models import CourseEnrolment
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class CohortResult:
+    """Serial numbers of the students enrolled and of those already enrolled"""
+    created: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+
+
+def enrol_cohort(students, course, enrolment_date, deadline, status, active_status='Active'):
+    """
+    Enrols ``students`` (a Student queryset or iterable of Students) in
+    ``course`` with a shared enrolment date, deadline and status. Students
+    already enrolled in the course are skipped.
+    """
+    if hasattr(students, 'values_list'):
+        cohort = list(students.values_list('pk', 'serial_number'))
+    else:
+        cohort = [(student.pk, student.serial_number) for student in students]
+    result = CohortResult()
+    with transaction.atomic():
+        enrolled = set(CourseEnrolment.objects.filter(course=course).values_list('student_id', flat=True))
+        new_enrolments = []
+        for student_id, serial_number in cohort:
+            if student_id in enrolled:
+                result.skipped.append(serial_number)
+                continue
+            enrolled.add(student_id)
+            result.created.append(serial_number)
+            new_enrolments.append(CourseEnrolment(
+                # Same convention as CourseEnrolmentAdmin.save_model.
+                serial_number=f"{serial_number}_{course.serial_number}",
+                student_id=student_id,
+                course=course,
+                enrolment_date=enrolment_date,
+                deadline=deadline,
+                status=status,
+                active_status=active_status,
+            ))
+        CourseEnrolment.objects.bulk_create(new_enrolments, batch_size=BATCH_SIZE)
+    return result
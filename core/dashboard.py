@@ -0,0 +1,193 @@
+"""
+Cached dashboard fragments for the admin index.
+
+Each fragment runs a fixed number of aggregate queries and caches plain data
+(no model instances), so the dashboard renders in a constant number of
+queries on a cold cache and in none on a warm one. Fragments are dropped by
+core.signals when a model they depend on is saved or deleted; bulk updates,
+which send no signals, and the passing of dates are covered by the
+TMS_DASHBOARD_CACHE_SECONDS timeout and by keying fragments on today's date.
+Users only see the fragments whose models they have view permission on.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.db.models import Count
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+
+from .models import Student, Course, CourseEnrolment, Exam, Job
+from .routers import replica_reads
+
+# Number of rows listed under the overdue enrolment and headless course counts.
+LIST_SIZE = 10
+
+
+@dataclass(frozen=True)
+class Fragment:
+    name: str
+    compute: Callable
+    # Models whose changes invalidate the fragment.
+    models: tuple
+
+
+FRAGMENTS = {}
+
+
+def fragment(*models):
+    """Registers the decorated function as a dashboard fragment depending on ``models``"""
+    def decorator(func):
+        FRAGMENTS[func.__name__] = Fragment(func.__name__, func, models)
+        return func
+    return decorator
+
+
+def _timeout():
+    return getattr(settings, 'TMS_DASHBOARD_CACHE_SECONDS', 60)
+
+
+def fragment_cache_key(name, today):
+    return f"tms:dashboard:{name}:{today.isoformat()}"
+
+
+def recent_actions_cache_key(user_id):
+    return f"tms:dashboard:recent-actions:{user_id}"
+
+
+def _counts_by(queryset, field, choices):
+    counts = dict(queryset.values_list(field).annotate(count=Count('pk')).values_list(field, 'count'))
+    return [(label, counts.get(value, 0)) for value, label in choices]
+
+
+@fragment(Student)
+def student_status(today):
+    return _counts_by(Student.objects.order_by(), 'status', Student._meta.get_field('status').choices)
+
+
+@fragment(CourseEnrolment)
+def enrolment_status(today):
+    return _counts_by(
+        CourseEnrolment.objects.filter(active_status='Active').order_by(),
+        'status', CourseEnrolment._meta.get_field('status').choices,
+    )
+
+
+@fragment(Job)
+def job_status(today):
+    return _counts_by(Job.objects.order_by(), 'status', Job._meta.get_field('status').choices)
+
+
+@fragment(CourseEnrolment, Student, Course)
+def overdue_enrolments(today):
+    """Active enrolments past their deadline without a completion date, most overdue first"""
+    queryset = CourseEnrolment.objects.filter(
+        active_status='Active', completion_date__isnull=True, deadline__lt=today,
+    )
+    rows = [
+        {**row, 'days_overdue': (today - row['deadline']).days}
+        for row in queryset.order_by('deadline', 'pk').values(
+            'pk', 'serial_number', 'deadline', 'student__name', 'course__course_name',
+        )[:LIST_SIZE]
+    ]
+    return {'count': queryset.count(), 'rows': rows}
+
+
+@fragment(Exam)
+def exams_this_week(today):
+    """Active exams from Monday to Sunday of the current week, by exam type"""
+    start = today - timedelta(days=today.weekday())
+    end = start + timedelta(days=6)
+    by_type = _counts_by(
+        Exam.objects.filter(active_status='Active', exam_date__range=(start, end)).order_by(),
+        'exam_type', Exam._meta.get_field('exam_type').choices,
+    )
+    return {'start': start, 'end': end, 'count': sum(count for _, count in by_type), 'by_type': by_type}
+
+
+@fragment(Course)
+def courses_without_head(today):
+    queryset = Course.objects.filter(course_head__isnull=True)
+    rows = list(queryset.order_by('course_name', 'pk').values('pk', 'serial_number', 'course_name')[:LIST_SIZE])
+    return {'count': queryset.count(), 'rows': rows}
+
+
+def visible_fragments(user):
+    """Names of the fragments ``user`` may see: those whose models they can all view"""
+    return [
+        name for name, spec in FRAGMENTS.items()
+        if all(user.has_perm(f"{model._meta.app_label}.view_{model._meta.model_name}") for model in spec.models)
+    ]
+
+
+def get_dashboard(request=None):
+    """
+    Returns by name the data of every fragment the request's user may see,
+    computing and caching only the fragments missing from the cache. Queries
+    go to the read replica, if any.
+    """
+    today = timezone.localdate()
+    names = visible_fragments(request.user) if request is not None else list(FRAGMENTS)
+    keys = {fragment_cache_key(name, today): name for name in names}
+    cached = cache.get_many(list(keys)) if keys else {}
+    dashboard = {keys[key]: value for key, value in cached.items()}
+    missing = {}
+    if len(dashboard) < len(keys):
+        with replica_reads(request):
+            for key, name in keys.items():
+                if name not in dashboard:
+                    dashboard[name] = missing[key] = FRAGMENTS[name].compute(today)
+        cache.set_many(missing, _timeout())
+    return dashboard
+
+
+def log_entry_url(entry):
+    """
+    Admin link for a log entry. Log entries record the integer primary key, so
+    models keyed by serial number in admin URLs are linked through their
+    primary key redirect instead of LogEntry.get_admin_url().
+    """
+    model = entry.content_type.model_class() if entry.content_type else None
+    if model is not None and any(field.name == 'serial_number' for field in model._meta.fields):
+        try:
+            return reverse(f"admin:{model._meta.app_label}_{model._meta.model_name}_by_id", args=(entry.object_id, 'change'))
+        except NoReverseMatch:
+            return None
+    return entry.get_admin_url()
+
+
+def get_recent_actions(user, limit=10):
+    """The admin's "My actions" sidebar for ``user``, cached as plain data"""
+    key = recent_actions_cache_key(user.pk)
+    actions = cache.get(key)
+    if actions is None:
+        actions = [
+            {
+                'is_addition': entry.is_addition(),
+                'is_change': entry.is_change(),
+                'is_deletion': entry.is_deletion(),
+                'object_repr': entry.object_repr,
+                'admin_url': None if entry.is_deletion() else log_entry_url(entry),
+                'content_type': entry.content_type.name if entry.content_type else None,
+            }
+            for entry in LogEntry.objects.filter(user=user).select_related('content_type')[:limit]
+        ]
+        cache.set(key, actions, _timeout())
+    return actions
+
+
+def invalidate_model(model):
+    """Drops today's fragments that depend on ``model``"""
+    today = timezone.localdate()
+    cache.delete_many([
+        fragment_cache_key(name, today)
+        for name, spec in FRAGMENTS.items()
+        if model in spec.models
+    ])
+
+
+def invalidate_recent_actions(user_id):
+    cache.delete(recent_actions_cache_key(user_id))
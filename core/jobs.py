@@ -0,0 +1,320 @@
+"""
+Database-backed background job queue.
+
+Heavy work (large exports, report rebuilds, roster imports) is queued as a Job
+row with enqueue() and run by the `run_jobs` worker command, so it never ties
+up an HTTP worker. Everything runs locally against the project database; no
+external broker is needed.
+
+Handlers are registered by kind with @handler('kind') and receive a
+JobContext for reporting progress and saving a downloadable result.
+Jobs are claimed with a conditional UPDATE, so several workers can share one
+queue, and the worker heartbeats the jobs it runs so that requeue_stale() only
+requeues jobs whose worker died. Failed jobs are retried with exponential backoff up to
+``Job.max_attempts``, and ``TMS_JOB_CONCURRENCY`` caps how many jobs of a kind
+run at once. The cap is checked by the claiming UPDATE itself, so it holds
+across workers on databases that serialize writes, like SQLite; on others,
+workers claiming at the same moment can briefly exceed it.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import connections
+from django.db.models import Count, F, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Minimum seconds between progress writes, so tight loops don't flood the database.
+PROGRESS_INTERVAL = 0.5
+
+# Selected primary keys looked up per query, well under SQLite's limit on
+# variables in one statement.
+BATCH_SIZE = 1000
+
+
+def handler(kind):
+    """Registers the decorated function as the handler for jobs of ``kind``"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, priority=0, user=None, max_attempts=3, run_after=None):
+    """Queues a job and returns it"""
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for {kind!r}.")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """Passed to handlers to report progress and store the job's result"""
+
+    def __init__(self, job):
+        self.job = job
+        self._last_progress = 0.0
+
+    @property
+    def payload(self):
+        return self.job.payload
+
+    def progress(self, done, total=None, message='', force=False):
+        """Records progress; writes are throttled to one every PROGRESS_INTERVAL seconds"""
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        fields = {'progress_done': done, 'heartbeat_at': timezone.now()}
+        if total is not None:
+            fields['progress_total'] = total
+        if message:
+            fields['progress_message'] = message[:200]
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+
+    def save_result(self, filename, content):
+        """Stores ``content`` (str, bytes or a binary file) as the job's downloadable result file"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        content = ContentFile(content) if isinstance(content, bytes) else File(content)
+        self.job.result_file.save(f"{self.job.pk}-{filename}", content, save=False)
+        Job.objects.filter(pk=self.job.pk).update(result_file=self.job.result_file.name)
+
+
+def concurrency_limits():
+    return getattr(settings, 'TMS_JOB_CONCURRENCY', {})
+
+
+def blocked_kinds(limits):
+    """Kinds whose running jobs have reached their concurrency limit"""
+    if not limits:
+        return set()
+    running = dict(
+        Job.objects.filter(status='Running', kind__in=list(limits))
+        .values_list('kind').annotate(count=Count('pk')).values_list('kind', 'count')
+    )
+    return {kind for kind, limit in limits.items() if running.get(kind, 0) >= limit}
+
+
+def claim_next(worker, exclude_kinds=()):
+    """
+    Atomically claims the highest-priority runnable job and returns it, or None.
+    Kinds at their TMS_JOB_CONCURRENCY limit and ``exclude_kinds`` are skipped.
+    """
+    limits = concurrency_limits()
+    blocked = set(exclude_kinds) | blocked_kinds(limits)
+    candidates = (
+        Job.objects.filter(status='Queued', run_after__lte=timezone.now())
+        .exclude(kind__in=blocked)
+        .order_by('-priority', 'run_after', 'pk')
+        .values_list('pk', 'kind')[:10]
+    )
+    for pk, kind in candidates:
+        now = timezone.now()
+        claim = Job.objects.filter(pk=pk, status='Queued')
+        if kind in limits:
+            # blocked_kinds() may be stale by now, so the running count is
+            # checked again in the same statement that claims the job.
+            running = (
+                Job.objects.filter(status='Running', kind=kind)
+                .values('kind').annotate(count=Count('pk')).values('count')
+            )
+            claim = claim.alias(running=Coalesce(Subquery(running), 0)).filter(running__lt=limits[kind])
+        claimed = claim.update(
+            status='Running', worker=worker, started_at=now, heartbeat_at=now,
+            finished_at=None, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Runs a claimed job's handler and records its outcome"""
+    try:
+        func = HANDLERS.get(job.kind)
+        if func is None:
+            raise LookupError(f"No job handler registered for {job.kind!r}.")
+        func(JobContext(job))
+    except Exception:
+        logger.exception('Job %s failed (attempt %s of %s)', job.pk, job.attempts, job.max_attempts)
+        record_failure(job, traceback.format_exc())
+        return False
+    else:
+        Job.objects.filter(pk=job.pk).update(status='Succeeded', error='', finished_at=timezone.now())
+        return True
+    finally:
+        # Worker threads and processes must not keep connections open between jobs.
+        connections.close_all()
+
+
+def record_failure(job, error):
+    """Requeues a failed job with exponential backoff, or fails it after its last attempt"""
+    if job.attempts < job.max_attempts:
+        backoff = getattr(settings, 'TMS_JOB_RETRY_BACKOFF_SECONDS', 10) * 2 ** (job.attempts - 1)
+        Job.objects.filter(pk=job.pk).update(
+            status='Queued', error=error, run_after=timezone.now() + timedelta(seconds=backoff),
+        )
+    else:
+        Job.objects.filter(pk=job.pk).update(status='Failed', error=error, finished_at=timezone.now())
+
+
+def run_job_by_id(pk):
+    """Entry point for process-pool workers, which cannot receive model instances"""
+    return run_job(Job.objects.get(pk=pk))
+
+
+def heartbeat(pks):
+    """Marks the running jobs among ``pks`` as alive, so requeue_stale() leaves them be"""
+    return Job.objects.filter(pk__in=list(pks), status='Running').update(heartbeat_at=timezone.now())
+
+
+def requeue_stale(timeout=None):
+    """Requeues running jobs whose heartbeat stopped, e.g. because their worker died"""
+    timeout = timeout or getattr(settings, 'TMS_JOB_STALE_SECONDS', 600)
+    return Job.objects.filter(
+        status='Running', heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status='Queued', worker='')
+
+
+def changelist_queryset(model, changelist_filters, user):
+    """
+    Rebuilds the admin changelist queryset of ``model`` for a query string
+    such as "status=Active&q=ali", as seen by ``user``.
+    """
+    from django.contrib import admin
+    from django.contrib.auth.models import AnonymousUser
+    from django.http import HttpRequest, QueryDict
+
+    request = HttpRequest()
+    request.GET = QueryDict(changelist_filters)
+    request.user = user or AnonymousUser()
+    model_admin = admin.site.get_model_admin(model)
+    return model_admin.get_changelist_instance(request).queryset
+
+
+# Job handlers
+
+@handler('export_csv')
+def export_csv(context):
+    """
+    Exports a core model as CSV. Payload: ``model`` (e.g. "exam") and optionally
+    ``pks`` to restrict the export to selected records, or ``changelist_filters``
+    to export the records of a filtered admin changelist.
+    """
+    from .changefeed import get_feed_model
+    from .routers import replica_reads
+
+    model = get_feed_model(context.payload['model'])
+    queryset = model.objects.order_by('pk')
+    pks = context.payload.get('pks')
+    if pks is None:
+        querysets = [queryset]
+    else:
+        # Selections can hold more primary keys than SQLite accepts in one
+        # query, so they are exported a batch at a time, in primary key order.
+        pks = sorted(set(pks))
+        querysets = [queryset.filter(pk__in=pks[start:start + BATCH_SIZE]) for start in range(0, len(pks), BATCH_SIZE)]
+    fields = [field.attname for field in model._meta.concrete_fields]
+    with tempfile.TemporaryFile() as output:
+        # Rows are streamed to disk rather than built up in memory.
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(fields)
+        with replica_reads():
+            if context.payload.get('changelist_filters') is not None:
+                queryset = changelist_queryset(
+                    model, context.payload['changelist_filters'], context.job.created_by
+                ).order_by('pk')
+                querysets = [queryset]
+            total = queryset.count() if pks is None else len(pks)
+            done = 0
+            for batch in querysets:
+                for row in batch.values_list(*fields).iterator(chunk_size=2000):
+                    writer.writerow(row)
+                    done += 1
+                    context.progress(done, total)
+        context.progress(done, done, force=True)
+        text.flush()
+        text.detach()
+        output.seek(0)
+        context.save_result(f"{model._meta.model_name}.csv", output)
+
+
+@handler('exam_statistics')
+def exam_statistics(context):
+    """
+    Rebuilds the exam statistics report as JSON, for one course (payload
+    ``course``: serial number) or for every course.
+    """
+    from . import statistics
+    from .models import Course, Exam
+    from .routers import replica_reads
+
+    with replica_reads():
+        queryset = Exam.objects.filter(active_status='Active', course_enrolment__active_status='Active')
+        if context.payload.get('course'):
+            queryset = queryset.filter(course_enrolment__course__serial_number=context.payload['course'])
+        columns = statistics.exam_columns(queryset)
+        context.progress(1, 3, 'Summarizing', force=True)
+        report = {'summary': statistics.summarize(columns)}
+        context.progress(2, 3, 'Summarizing by course', force=True)
+        per_course = statistics.statistics_by_course(columns=columns)
+        serials = dict(Course.objects.filter(pk__in=list(per_course)).values_list('pk', 'serial_number'))
+    report['by_course'] = {serials[pk]: stats for pk, stats in per_course.items() if pk in serials}
+    context.progress(3, 3, 'Done', force=True)
+    context.save_result('exam_statistics.json', json.dumps(report, indent=2))
+
+
+@handler('sync_roster')
+def sync_roster(context):
+    """
+    Runs the roster sync from CSV files on the server. Payload: any of
+    ``students``, ``courses`` and ``enrolments`` (file paths), plus optional
+    ``deactivate_missing`` and ``dry_run`` flags.
+    """
+    from . import roster
+
+    def read(path):
+        if not path:
+            return None
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    payload = context.payload
+    context.progress(0, 1, 'Syncing roster', force=True)
+    results = roster.sync_roster(
+        students=read(payload.get('students')),
+        courses=read(payload.get('courses')),
+        enrolments=read(payload.get('enrolments')),
+        deactivate_missing=payload.get('deactivate_missing', False),
+        dry_run=payload.get('dry_run', False),
+    )
+    context.progress(1, 1, 'Done', force=True)
+    context.save_result('roster_sync.txt', '\n'.join(result.report() for result in results))
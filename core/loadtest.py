@@ -0,0 +1,319 @@
+"""
+End-to-end HTTP load testing.
+
+Virtual users (one thread each) log in to the admin and then repeatedly run
+weighted, scripted journeys against a running server until the test duration
+is over. Every journey is timed end to end, and the results are summarized as
+throughput, p50/p95/p99 latency and error rate per journey, which can be saved
+as JSON and compared with a baseline run.
+"""
+import http.client
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+# Journey weights used when no mix is given.
+DEFAULT_MIX = {
+    'browse': 30,
+    'search': 20,
+    'change_form': 20,
+    'save_exam': 10,
+    'export': 5,
+}
+
+
+class JourneyError(Exception):
+    """A response that does not match what the journey expects"""
+
+
+class HttpSession:
+    """Keep-alive HTTP connection with a cookie jar and Django CSRF handling"""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, method, path, data=None, expect=(200,)):
+        body = None
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{key}={value}" for key, value in self.cookies.items())
+        if data is not None:
+            body = urlencode(data, doseq=True)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies.get('csrftoken', '')
+            headers['Referer'] = f"http://{self.host}:{self.port}{path}"
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed a kept-alive connection; retry once on a new one.
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or []:
+            cookie = SimpleCookie(header)
+            for key, morsel in cookie.items():
+                self.cookies[key] = morsel.value
+        if response.status not in expect:
+            raise JourneyError(f"{method} {path} returned {response.status}, expected {'/'.join(map(str, expect))}")
+        return content
+
+    def get(self, path, expect=(200,)):
+        return self.request('GET', path, expect=expect)
+
+    def post(self, path, data, expect=(302,)):
+        return self.request('POST', path, data=data, expect=expect)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+@dataclass
+class Fixtures:
+    """Records sampled from the dataset for journeys to use"""
+    # (serial_number, course_enrolment_id, total_marks, exam_type, exam_date) of sample exams.
+    exams: list
+    exam_ids: list
+    student_names: list
+    course_ids: list
+
+    @classmethod
+    def from_sqlite(cls, path, size=500):
+        """Samples fixtures straight from the dataset's SQLite file"""
+        connection = sqlite3.connect(str(path))
+        try:
+            # ExamForm only accepts active enrolments, so exams on inactive
+            # ones would make save_exam fail on its own fixtures.
+            exams = connection.execute(
+                'SELECT e.serial_number, e.course_enrolment_id, e.total_marks, e.exam_type, e.exam_date '
+                'FROM core_exam e JOIN core_courseenrolment ce ON ce.id = e.course_enrolment_id '
+                "WHERE ce.active_status = 'Active' ORDER BY random() LIMIT ?", (size,)
+            ).fetchall()
+            exam_ids = [row[0] for row in connection.execute(
+                'SELECT id FROM core_exam ORDER BY random() LIMIT ?', (size,)
+            )]
+            names = [row[0] for row in connection.execute(
+                'SELECT name FROM core_student ORDER BY random() LIMIT ?', (size,)
+            )]
+            course_ids = [row[0] for row in connection.execute('SELECT id FROM core_course')]
+        finally:
+            connection.close()
+        if not exams:
+            raise ValueError(f"No exams found in {path}; generate a dataset first.")
+        return cls(exams, exam_ids, names, course_ids)
+
+
+def login(session, username, password):
+    session.get('/admin/login/')
+    session.post('/admin/login/?next=/admin/', {
+        'username': username, 'password': password, 'next': '/admin/',
+    })
+    session.get('/admin/')
+
+
+def browse(session, fixtures, rng):
+    """Filtered enrolment changelist, first and second page"""
+    query = urlencode({
+        'active_status__exact': 'Active',
+        'course__id__exact': rng.choice(fixtures.course_ids),
+    })
+    session.get(f'/admin/core/courseenrolment/?{query}')
+    session.get(f'/admin/core/exam/?exam_type__exact={rng.choice(["Quiz", "Practical"])}&p=1')
+
+
+def search(session, fixtures, rng):
+    name = rng.choice(fixtures.student_names).split()[0]
+    session.get(f'/admin/core/student/?{urlencode({"q": name})}')
+
+
+def change_form(session, fixtures, rng):
+    serial_number = rng.choice(fixtures.exams)[0]
+    session.get(f'/admin/core/exam/{serial_number}/change/')
+
+
+def save_exam(session, fixtures, rng):
+    """Open an exam's change form and save new obtained marks"""
+    serial_number, enrolment_id, total_marks, exam_type, exam_date = rng.choice(fixtures.exams)
+    path = f'/admin/core/exam/{serial_number}/change/'
+    session.get(path)
+    total = float(total_marks)
+    session.post(path, {
+        'course_enrolment': enrolment_id,
+        'exam_type': exam_type,
+        'exam_date': exam_date,
+        'active_status': 'Active',
+        'total_marks': f"{total:.2f}",
+        'obtained_marks': f"{rng.uniform(0, total):.2f}",
+        '_save': 'Save',
+    })
+
+
+def export(session, fixtures, rng):
+    """CSV export admin action on a selection of exams"""
+    session.post('/admin/core/exam/', {
+        'action': 'export_as_csv',
+        'index': 0,
+        '_selected_action': rng.sample(fixtures.exam_ids, min(100, len(fixtures.exam_ids))),
+    }, expect=(200,))
+
+
+JOURNEYS = {
+    'browse': browse,
+    'search': search,
+    'change_form': change_form,
+    'save_exam': save_exam,
+    'export': export,
+}
+
+
+@dataclass
+class Recorder:
+    """Thread-safe collection of (journey, seconds, error) samples"""
+    samples: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    error_messages: dict = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, journey, seconds, error=None):
+        with self.lock:
+            self.samples.setdefault(journey, []).append(seconds)
+            if error is not None:
+                self.errors[journey] = self.errors.get(journey, 0) + 1
+                message = str(error)
+                self.error_messages[message] = self.error_messages.get(message, 0) + 1
+
+
+def timed(recorder, name, func, *args):
+    start = time.perf_counter()
+    error = None
+    try:
+        func(*args)
+    except Exception as e:  # Every failure counts as an error for the journey.
+        error = e
+    recorder.record(name, time.perf_counter() - start, error)
+    return error is None
+
+
+def virtual_user(host, port, username, password, fixtures, mix, deadline, recorder, seed):
+    rng = random.Random(seed)
+    session = HttpSession(host, port)
+    names, weights = zip(*mix.items())
+    try:
+        if not timed(recorder, 'login', login, session, username, password):
+            return
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            timed(recorder, name, JOURNEYS[name], session, fixtures, rng)
+    finally:
+        session.close()
+
+
+def run(host, port, username, password, fixtures, concurrency, duration, mix=None, seed=0):
+    """Runs ``concurrency`` virtual users for ``duration`` seconds and returns the summary"""
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(JOURNEYS)
+    if unknown:
+        raise ValueError(f"Unknown journeys: {', '.join(sorted(unknown))}")
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for user in range(concurrency):
+            executor.submit(
+                virtual_user, host, port, username, password, fixtures, mix, deadline, recorder, seed + user,
+            )
+    elapsed = time.monotonic() - started
+    return summarize(recorder, elapsed, concurrency)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def _describe(samples, errors, elapsed):
+    values = sorted(samples)
+    return {
+        'count': len(values),
+        'errors': errors,
+        'error_rate': errors / len(values) if values else 0.0,
+        'throughput_per_s': len(values) / elapsed if elapsed else 0.0,
+        'mean_ms': sum(values) * 1000 / len(values) if values else None,
+        'p50_ms': percentile(values, 0.50) * 1000 if values else None,
+        'p95_ms': percentile(values, 0.95) * 1000 if values else None,
+        'p99_ms': percentile(values, 0.99) * 1000 if values else None,
+    }
+
+
+def summarize(recorder, elapsed, concurrency):
+    journeys = {
+        name: _describe(samples, recorder.errors.get(name, 0), elapsed)
+        for name, samples in sorted(recorder.samples.items())
+    }
+    all_samples = [value for name, samples in recorder.samples.items() if name != 'login' for value in samples]
+    all_errors = sum(count for name, count in recorder.errors.items() if name != 'login')
+    return {
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'journeys': journeys,
+        'total': _describe(all_samples, all_errors, elapsed),
+        'error_messages': dict(sorted(recorder.error_messages.items(), key=lambda item: -item[1])[:10]),
+    }
+
+
+# Metrics compared against a baseline, and whether higher values are better.
+COMPARED_METRICS = (
+    ('throughput_per_s', True),
+    ('p50_ms', False),
+    ('p95_ms', False),
+    ('p99_ms', False),
+    ('error_rate', False),
+)
+
+
+def compare(result, baseline, tolerance=0.10):
+    """
+    Compares ``result`` with ``baseline`` per journey. Returns rows of
+    (journey, metric, baseline value, current value, relative change, regressed).
+    """
+    rows = []
+    journeys = {**baseline['journeys'], 'total': baseline['total']}
+    current = {**result['journeys'], 'total': result['total']}
+    for name, before in journeys.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            if old:
+                change = (new - old) / old
+            else:
+                change = 0.0 if not new else float('inf')
+            worse = -change if higher_is_better else change
+            if metric == 'error_rate':
+                regressed = new - old > 0.01
+            else:
+                regressed = worse > tolerance
+            rows.append((name, metric, old, new, change, regressed))
+    return rows
@@ -0,0 +1,71 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.models import Student
+
+# Session engine and backend used before the cached fast path.
+BASELINE_SETTINGS = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Count database queries per admin request for a staff user, with the '
+        'database-backed session and auth path and with the configured fast path. '
+        'Everything created here is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per URL after a warm-up request')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.create_staff_user()
+            urls = self.admin_urls()
+            with override_settings(**BASELINE_SETTINGS):
+                baseline = self.measure(user, urls, options['repeat'])
+            cache.clear()
+            fast = self.measure(user, urls, options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'URL':<45} {'baseline':>9} {'fast path':>10}")
+        for url in urls:
+            self.stdout.write(f"{url:<45} {baseline[url]:>9.1f} {fast[url]:>10.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Mean queries per request':<45} {sum(baseline.values()) / len(urls):>9.1f} "
+            f"{sum(fast.values()) / len(urls):>10.1f}"
+        ))
+
+    def create_staff_user(self):
+        """A non-superuser staff member whose permissions come from a group"""
+        group = Group.objects.create(name='Benchmark staff')
+        group.permissions.set(Permission.objects.filter(content_type__app_label='core'))
+        user = User.objects.create_user('benchmark-staff', password='benchmark-password', is_staff=True)
+        user.groups.add(group)
+        return user
+
+    def admin_urls(self):
+        urls = ['/admin/', '/admin/core/student/', '/admin/core/exam/', '/admin/core/course/']
+        student = Student.objects.first()
+        if student is not None:
+            urls.append(f'/admin/core/student/{student.serial_number}/change/')
+        return urls
+
+    def measure(self, user, urls, repeat):
+        """Mean number of queries per request for each URL, after one warm-up request"""
+        client = Client(HTTP_HOST='localhost')
+        client.login(username=user.username, password='benchmark-password')
+        results = {}
+        for url in urls:
+            client.get(url)
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+                for _ in range(repeat):
+                    client.get(url)
+            results[url] = len(queries) / repeat
+        return results
@@ -0,0 +1,109 @@
+import statistics as pystatistics
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import statistics
+from core.models import Student, Course, CourseEnrolment, Exam
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the vectorized exam statistics against the per-object '
+        'Exam.result_in_percentage path. Synthetic data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000, help='Number of synthetic exams')
+        parser.add_argument('--students', type=int, default=500, help='Number of synthetic enrolments')
+        parser.add_argument('--bins', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            course = self.create_data(options)
+            queryset = Exam.objects.filter(course_enrolment__course=course)
+
+            start = time.perf_counter()
+            per_object = self.per_object_summary(queryset, options['bins'])
+            per_object_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vectorized = statistics.summarize(statistics.exam_columns(queryset), bins=options['bins'])
+            vectorized_seconds = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Exams:        {options['count']}")
+        self.stdout.write(f"Per-object:   {per_object_seconds:.3f}s (mean {per_object['mean']:.4f}%)")
+        self.stdout.write(f"Vectorized:   {vectorized_seconds:.3f}s (mean {vectorized['mean']:.4f}%)")
+        if vectorized_seconds:
+            self.stdout.write(self.style.SUCCESS(f"Speed-up:     {per_object_seconds / vectorized_seconds:.1f}x"))
+
+    def create_data(self, options):
+        """Creates one course with ``--students`` enrolments and ``--count`` exams"""
+        self.stdout.write('Creating synthetic data...')
+        students = Student.objects.bulk_create([
+            Student(
+                serial_number=f"BST{i:06d}",
+                name=f"Benchmark Student {i}",
+                father_name='Benchmark',
+                cnic=f"99999-{i:07d}-9",
+                email=f"benchmark{i}@example.com",
+                contact_number='+92-300-0000000',
+                joining_date=date(2024, 1, 1),
+                address='Benchmark',
+            )
+            for i in range(options['students'])
+        ], batch_size=options['batch_size'])
+        course = Course.objects.create(
+            serial_number='BCRS001', course_name='Benchmark Course', course_duration_hours=1
+        )
+        enrolments = CourseEnrolment.objects.bulk_create([
+            CourseEnrolment(
+                serial_number=f"{student.serial_number}_{course.serial_number}",
+                student=student,
+                course=course,
+                enrolment_date=date(2024, 1, 1),
+                deadline=date(2024, 6, 1),
+                status='Semester 1',
+            )
+            for student in students
+        ], batch_size=options['batch_size'])
+        totals = (Decimal('30.00'), Decimal('50.00'), Decimal('100.00'))
+        exam_types = ('Quiz', 'Practical')
+        batch = []
+        for i in range(options['count']):
+            total = totals[i % len(totals)]
+            batch.append(Exam(
+                serial_number=f"BEX{i:08d}",
+                course_enrolment=enrolments[i % len(enrolments)],
+                exam_type=exam_types[i % len(exam_types)],
+                exam_date=date(2024, 2, 1),
+                total_marks=total,
+                obtained_marks=(total * ((i * 7919) % 101)) / 100,
+            ))
+            if len(batch) >= options['batch_size']:
+                Exam.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Exam.objects.bulk_create(batch)
+        return course
+
+    def per_object_summary(self, queryset, bins):
+        """The same statistics computed one Exam instance at a time"""
+        values = [float(exam.result_in_percentage) for exam in queryset.iterator(chunk_size=2000)]
+        counts = [0] * bins
+        for value in values:
+            counts[min(max(int(value * bins / 100), 0), bins - 1)] += 1
+        return {
+            'count': len(values),
+            'mean': pystatistics.fmean(values),
+            'std': pystatistics.pstdev(values),
+            'quantiles': pystatistics.quantiles(values, n=4),
+            'histogram': counts,
+            'pass_rate': sum(value >= statistics.PASS_PERCENTAGE for value in values) * 100 / len(values),
+        }
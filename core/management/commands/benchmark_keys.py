@@ -0,0 +1,163 @@
+import sqlite3
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+# Table layouts before and after the move to integer surrogate keys, mirroring
+# the columns and indexes Django creates for core (non-key columns trimmed).
+SCHEMAS = {
+    'serial_number primary keys': """
+        CREATE TABLE student (serial_number varchar(20) PRIMARY KEY, name varchar(100));
+        CREATE TABLE course (serial_number varchar(20) PRIMARY KEY, course_name varchar(150));
+        CREATE TABLE enrolment (
+            serial_number varchar(20) PRIMARY KEY,
+            student_id varchar(20) REFERENCES student (serial_number),
+            course_id varchar(20) REFERENCES course (serial_number)
+        );
+        CREATE TABLE exam (
+            serial_number varchar(20) PRIMARY KEY,
+            enrolment_id varchar(20) REFERENCES enrolment (serial_number),
+            obtained_marks decimal, total_marks decimal
+        );
+        CREATE INDEX enrolment_student ON enrolment (student_id);
+        CREATE INDEX enrolment_course ON enrolment (course_id);
+        CREATE UNIQUE INDEX enrolment_student_course ON enrolment (student_id, course_id);
+        CREATE INDEX exam_enrolment ON exam (enrolment_id);
+    """,
+    'integer surrogate keys': """
+        CREATE TABLE student (id integer PRIMARY KEY AUTOINCREMENT, serial_number varchar(20) UNIQUE, name varchar(100));
+        CREATE TABLE course (id integer PRIMARY KEY AUTOINCREMENT, serial_number varchar(20) UNIQUE, course_name varchar(150));
+        CREATE TABLE enrolment (
+            id integer PRIMARY KEY AUTOINCREMENT,
+            serial_number varchar(20) UNIQUE,
+            student_id bigint REFERENCES student (id),
+            course_id bigint REFERENCES course (id)
+        );
+        CREATE TABLE exam (
+            id integer PRIMARY KEY AUTOINCREMENT,
+            serial_number varchar(20) UNIQUE,
+            enrolment_id bigint REFERENCES enrolment (id),
+            obtained_marks decimal, total_marks decimal
+        );
+        CREATE INDEX enrolment_student ON enrolment (student_id);
+        CREATE INDEX enrolment_course ON enrolment (course_id);
+        CREATE UNIQUE INDEX enrolment_student_course ON enrolment (student_id, course_id);
+        CREATE INDEX exam_enrolment ON exam (enrolment_id);
+    """,
+}
+
+# The join behind exam listings and course reports.
+JOIN_QUERY = """
+    SELECT course.course_name, student.name, exam.obtained_marks, exam.total_marks
+    FROM exam
+    JOIN enrolment ON exam.enrolment_id = enrolment.{key}
+    JOIN student ON enrolment.student_id = student.{key}
+    JOIN course ON enrolment.course_id = course.{key}
+    WHERE course.{key} = ?
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare join latency and index size of the old serial_number primary keys '
+        'with integer surrogate keys, on identical synthetic data in in-memory SQLite databases.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--courses-per-student', type=int, default=5)
+        parser.add_argument('--exams-per-enrolment', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs of the join query')
+
+    def handle(self, *args, **options):
+        results = {}
+        for label, schema in SCHEMAS.items():
+            self.stdout.write(f"Building {label}...")
+            connection = sqlite3.connect(':memory:')
+            connection.executescript(schema)
+            integer_keys = 'id integer' in schema
+            self.populate(connection, integer_keys, options)
+            results[label] = {
+                'join_ms': self.time_join(connection, integer_keys, options),
+                'index_kib': self.index_size(connection) / 1024,
+                'table_kib': self.table_size(connection) / 1024,
+            }
+            connection.close()
+
+        self.stdout.write(f"{'':<30} {'join (ms, median)':>18} {'index KiB':>10} {'table KiB':>10}")
+        for label, result in results.items():
+            self.stdout.write(
+                f"{label:<30} {result['join_ms']:>18.2f} {result['index_kib']:>10.0f} {result['table_kib']:>10.0f}"
+            )
+
+    def populate(self, connection, integer_keys, options):
+        """Inserts the same roster in both layouts; serial numbers follow the admin's conventions"""
+        students = [f"STU{i:06X}" for i in range(options['students'])]
+        courses = [f"CRS{i:06X}" for i in range(options['courses'])]
+        if integer_keys:
+            connection.executemany('INSERT INTO student (serial_number, name) VALUES (?, ?)', ((s, s) for s in students))
+            connection.executemany('INSERT INTO course (serial_number, course_name) VALUES (?, ?)', ((c, c) for c in courses))
+        else:
+            connection.executemany('INSERT INTO student VALUES (?, ?)', ((s, s) for s in students))
+            connection.executemany('INSERT INTO course VALUES (?, ?)', ((c, c) for c in courses))
+
+        enrolments = []
+        for i, student in enumerate(students):
+            for j in range(options['courses_per_student']):
+                course_index = (i + j * 7) % len(courses)
+                enrolments.append((f"{student}_{courses[course_index]}", i, course_index))
+        if integer_keys:
+            connection.executemany(
+                'INSERT INTO enrolment (serial_number, student_id, course_id) VALUES (?, ?, ?)',
+                ((serial, student + 1, course + 1) for serial, student, course in enrolments),
+            )
+        else:
+            connection.executemany(
+                'INSERT INTO enrolment VALUES (?, ?, ?)',
+                ((serial, students[student], courses[course]) for serial, student, course in enrolments),
+            )
+
+        exams = (
+            (f"EXM{len(enrolments) * n + e:08X}", e, enrolments[e][0])
+            for e in range(len(enrolments))
+            for n in range(options['exams_per_enrolment'])
+        )
+        if integer_keys:
+            connection.executemany(
+                'INSERT INTO exam (serial_number, enrolment_id, obtained_marks, total_marks) VALUES (?, ?, 40, 50)',
+                ((serial, e + 1) for serial, e, _ in exams),
+            )
+        else:
+            connection.executemany(
+                'INSERT INTO exam VALUES (?, ?, 40, 50)',
+                ((serial, enrolment) for serial, _, enrolment in exams),
+            )
+        connection.commit()
+        connection.execute('ANALYZE')
+
+    def time_join(self, connection, integer_keys, options):
+        """Median wall time of the report join for one course, in milliseconds"""
+        key = 'id' if integer_keys else 'serial_number'
+        course = 1 if integer_keys else 'CRS000000'
+        query = JOIN_QUERY.format(key=key)
+        timings = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            connection.execute(query, (course,)).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def index_size(self, connection):
+        """Bytes used by all indexes, including the automatic ones behind PRIMARY KEY and UNIQUE"""
+        return connection.execute(
+            "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'index')"
+        ).fetchone()[0]
+
+    def table_size(self, connection):
+        return connection.execute(
+            "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%')"
+        ).fetchone()[0]
@@ -0,0 +1,40 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+
+from core import changefeed
+
+
+class Command(BaseCommand):
+    help = (
+        'Print changes and deletions of a core model since a cursor or datetime, as JSON. '
+        'Pass the printed cursor back with --cursor to fetch the next batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help=f"One of: {', '.join(changefeed.FEED_MODELS)}")
+        parser.add_argument('--cursor', help='Cursor returned by the previous batch')
+        parser.add_argument('--since', help='ISO datetime to start from when no cursor is given')
+        parser.add_argument('--limit', type=int, default=changefeed.DEFAULT_LIMIT)
+        parser.add_argument('--all', action='store_true', help='Keep fetching batches until caught up')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since datetime: {options['since']}")
+        cursor = options['cursor']
+        try:
+            model = changefeed.get_feed_model(options['model'])
+            while True:
+                batch = changefeed.changes_since(model, cursor=cursor, since=since, limit=options['limit'])
+                self.stdout.write(json.dumps(batch, cls=DjangoJSONEncoder))
+                cursor = batch['cursor']
+                if not (options['all'] and batch['has_more']):
+                    break
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cohorts import enrol_cohort
+from core.models import Course, Student, ENROLMENT_STATUS_CHOICES, ACTIVE_STATUS_CHOICES
+
+
+class Command(BaseCommand):
+    help = 'Enrol a cohort of students in a course with a shared deadline and status, skipping existing enrolments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', required=True, help='Course serial number')
+        parser.add_argument('--deadline', required=True, type=date.fromisoformat, help='YYYY-MM-DD')
+        parser.add_argument('--enrolment-date', type=date.fromisoformat, default=date.today(), help='YYYY-MM-DD, defaults to today')
+        parser.add_argument('--status', default=ENROLMENT_STATUS_CHOICES[0][0], choices=[c[0] for c in ENROLMENT_STATUS_CHOICES])
+        parser.add_argument('--active-status', default='Active', choices=[c[0] for c in ACTIVE_STATUS_CHOICES])
+        cohort = parser.add_mutually_exclusive_group(required=True)
+        cohort.add_argument('--students', nargs='+', metavar='SERIAL_NUMBER', help='Student serial numbers')
+        cohort.add_argument('--student-status', help="All students with this status, e.g. 'Active'")
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(serial_number=options['course'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course {options['course']} does not exist.")
+
+        if options['students']:
+            students = Student.objects.filter(serial_number__in=options['students'])
+            missing = set(options['students']) - set(students.values_list('serial_number', flat=True))
+            if missing:
+                raise CommandError(f"Unknown student serial numbers: {', '.join(sorted(missing))}")
+        else:
+            students = Student.objects.filter(status=options['student_status'])
+
+        result = enrol_cohort(
+            students, course, options['enrolment_date'], options['deadline'],
+            options['status'], options['active_status'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Enrolled {len(result.created)} students in {course.course_name}; "
+            f"skipped {len(result.skipped)} already enrolled."
+        ))
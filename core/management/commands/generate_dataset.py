@@ -0,0 +1,85 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Student, Course, CourseEnrolment, Exam, ENROLMENT_STATUS_CHOICES, EXAM_TYPE_CHOICES
+
+FIRST_NAMES = ['Ahmed', 'Fatima', 'Muhammad', 'Ayesha', 'Ali', 'Zainab', 'Hassan', 'Maryam', 'Usman', 'Hira']
+LAST_NAMES = ['Khan', 'Ali', 'Hassan', 'Ahmed', 'Malik', 'Qureshi', 'Sheikh', 'Butt', 'Raza', 'Iqbal']
+TOTALS = (Decimal('30.00'), Decimal('50.00'), Decimal('100.00'))
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset of students, courses, enrolments and exams (e.g. for load testing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--courses-per-student', type=int, default=3)
+        parser.add_argument('--exams-per-enrolment', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        start = date(2024, 1, 1)
+        with transaction.atomic():
+            students = Student.objects.bulk_create([
+                Student(
+                    serial_number=f"GST{i:06d}",
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+                    father_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    cnic=f"{10000 + i % 90000:05d}-{i:07d}-{i % 10}",
+                    email=f"student{i}@example.com",
+                    contact_number=f"+92-300-{i:07d}",
+                    joining_date=start + timedelta(days=rng.randrange(365)),
+                    address=f"{i} Generated Street",
+                    status='Active' if rng.random() < 0.9 else 'Inactive',
+                )
+                for i in range(options['students'])
+            ])
+            courses = Course.objects.bulk_create([
+                Course(
+                    serial_number=f"GCR{i:06d}",
+                    course_name=f"Generated Course {i}",
+                    course_duration_hours=rng.choice((20, 30, 40, 60)),
+                    course_head=rng.choice(students) if students and rng.random() < 0.8 else None,
+                )
+                for i in range(options['courses'])
+            ])
+            enrolments = []
+            for student in students:
+                for course in rng.sample(courses, min(options['courses_per_student'], len(courses))):
+                    enrolment_date = student.joining_date + timedelta(days=rng.randrange(30))
+                    enrolments.append(CourseEnrolment(
+                        serial_number=f"{student.serial_number}_{course.serial_number}",
+                        student=student,
+                        course=course,
+                        enrolment_date=enrolment_date,
+                        deadline=enrolment_date + timedelta(days=90),
+                        completion_date=(
+                            enrolment_date + timedelta(days=rng.randrange(60, 120)) if rng.random() < 0.5 else None
+                        ),
+                        status=rng.choice(ENROLMENT_STATUS_CHOICES)[0],
+                        active_status='Active' if rng.random() < 0.9 else 'Inactive',
+                    ))
+            enrolments = CourseEnrolment.objects.bulk_create(enrolments)
+            exams = []
+            for enrolment in enrolments:
+                for _ in range(options['exams_per_enrolment']):
+                    total = rng.choice(TOTALS)
+                    exams.append(Exam(
+                        serial_number=f"GEX{len(exams):07d}",
+                        course_enrolment=enrolment,
+                        exam_type=rng.choice(EXAM_TYPE_CHOICES)[0],
+                        exam_date=enrolment.enrolment_date + timedelta(days=rng.randrange(90)),
+                        total_marks=total,
+                        obtained_marks=(total * rng.randrange(101) / 100).quantize(Decimal('0.01')),
+                    ))
+            Exam.objects.bulk_create(exams)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(students)} students, {len(courses)} courses, "
+            f"{len(enrolments)} enrolments and {len(exams)} exams."
+        ))
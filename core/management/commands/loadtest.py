@@ -0,0 +1,187 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+
+USERNAME = 'loadtest'
+PASSWORD = 'loadtest-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run an end-to-end HTTP load test: start the app under WSGI or ASGI against a '
+        'generated dataset in a temporary SQLite database, drive scripted admin journeys '
+        'at the given concurrency, and report throughput, latency percentiles and error '
+        'rates per journey.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+        parser.add_argument('--concurrency', type=int, default=10, help='Number of virtual users')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run the journeys for')
+        parser.add_argument(
+            '--mix', help="Journey weights, e.g. 'browse=30,search=20,save_exam=10' "
+                          f"(journeys: {', '.join(loadtest.JOURNEYS)})",
+        )
+        parser.add_argument('--students', type=int, default=1000, help='Size of the generated dataset')
+        parser.add_argument('--database', help='Reuse this SQLite dataset instead of generating one')
+        parser.add_argument('--port', type=int, help='Port for the server (default: a free port)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Compare with the JSON results of an earlier run')
+        parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative regression')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        port = options['port'] or self.free_port()
+        with tempfile.TemporaryDirectory(prefix='tms-loadtest-') as workdir:
+            database = Path(options['database'] or Path(workdir) / 'loadtest.sqlite3')
+            env = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'TMS.settings'),
+                'TMS_DATABASE_NAME': str(database),
+                'DJANGO_SUPERUSER_PASSWORD': PASSWORD,
+            }
+            env.pop('TMS_REPLICA_DATABASE', None)
+            self.prepare_database(database, env, options)
+            fixtures = loadtest.Fixtures.from_sqlite(database)
+
+            server = self.start_server(options['server'], port, env, workdir)
+            try:
+                self.wait_until_ready(port, server)
+                self.stdout.write(
+                    f"Running {options['concurrency']} virtual users for {options['duration']:g}s "
+                    f"against {options['server'].upper()} on port {port}..."
+                )
+                result = loadtest.run(
+                    '127.0.0.1', port, USERNAME, PASSWORD, fixtures,
+                    concurrency=options['concurrency'], duration=options['duration'],
+                    mix=mix, seed=options['seed'],
+                )
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+        result['server'] = options['server']
+        result['dataset_students'] = options['students']
+        self.report(result)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(result, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+        if options['baseline']:
+            self.report_comparison(result, options['baseline'], options['tolerance'])
+
+    def parse_mix(self, value):
+        if not value:
+            return None
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            if name.strip() not in loadtest.JOURNEYS:
+                raise CommandError(f"Unknown journey '{name.strip()}'.")
+            try:
+                mix[name.strip()] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f"Invalid weight in --mix: {item}")
+        return mix
+
+    def free_port(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
+
+    def manage(self, env, *args):
+        subprocess.run(
+            [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), *args],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+
+    def prepare_database(self, database, env, options):
+        """Migrates the dataset database, fills it and creates the load test superuser"""
+        fresh = not database.exists()
+        self.stdout.write(f"Preparing dataset in {database}...")
+        self.manage(env, 'migrate', '--noinput')
+        if fresh:
+            self.manage(env, 'generate_dataset', '--students', str(options['students']), '--seed', str(options['seed']))
+        if subprocess.run(
+            [sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'createsuperuser', '--noinput',
+             '--username', USERNAME, '--email', 'loadtest@example.com'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ).returncode not in (0, 1):
+            raise CommandError('Could not create the load test superuser.')
+
+    def start_server(self, kind, port, env, workdir):
+        log = open(Path(workdir) / 'server.log', 'w')
+        if kind == 'wsgi':
+            command = [
+                sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'),
+                'runserver', '--noreload', f'127.0.0.1:{port}',
+            ]
+        elif importlib.util.find_spec('uvicorn'):
+            command = [
+                sys.executable, '-m', 'uvicorn', 'TMS.asgi:application',
+                '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning',
+            ]
+        elif importlib.util.find_spec('daphne'):
+            command = [sys.executable, '-m', 'daphne', '-b', '127.0.0.1', '-p', str(port), 'TMS.asgi:application']
+        else:
+            raise CommandError('The ASGI server needs uvicorn or daphne installed.')
+        return subprocess.Popen(command, env=env, cwd=settings.BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+
+    def wait_until_ready(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('The server exited during startup.')
+            try:
+                loadtest.HttpSession('127.0.0.1', port, timeout=2).get('/admin/login/')
+                return
+            except (OSError, loadtest.JourneyError):
+                time.sleep(0.2)
+        raise CommandError(f"The server did not start within {timeout}s.")
+
+    def report(self, result):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'journey':<14} {'count':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}"
+        )
+        rows = [*result['journeys'].items(), ('total', result['total'])]
+        for name, stats in rows:
+            if not stats['count']:
+                continue
+            self.stdout.write(
+                f"{name:<14} {stats['count']:>7} {stats['throughput_per_s']:>8.1f} {stats['p50_ms']:>9.1f} "
+                f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['error_rate']:>7.1%}"
+            )
+        for message, count in result['error_messages'].items():
+            self.stdout.write(self.style.WARNING(f"  {count} x {message}"))
+
+    def report_comparison(self, result, baseline_path, tolerance):
+        baseline = json.loads(Path(baseline_path).read_text())
+        rows = loadtest.compare(result, baseline, tolerance)
+        self.stdout.write('')
+        self.stdout.write(f"Compared with {baseline_path}:")
+        regressions = 0
+        for name, metric, old, new, change, regressed in rows:
+            line = f"{name:<14} {metric:<17} {old:>10.2f} -> {new:>10.2f} ({change:+.1%})"
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION"))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"{regressions} metrics regressed by more than the tolerance of {tolerance:.0%}.")
+        self.stdout.write(self.style.SUCCESS('No regressions beyond the tolerance.'))
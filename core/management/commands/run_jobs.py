@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs (exports, report rebuilds, roster imports) from the '
+        'database queue in a pool of threads or processes, highest priority first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Jobs run at the same time by this worker')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once no runnable jobs are left')
+        parser.add_argument(
+            '--heartbeat-interval', type=float, default=30.0,
+            help='Seconds between heartbeats for running jobs; keep well under TMS_JOB_STALE_SECONDS',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        name = jobs.worker_name()
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs."))
+
+        if options['pool'] == 'process':
+            # Pool processes are spawned fresh, set up Django themselves and open
+            # their own connections; none may be shared with the parent.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tms-job')
+
+        self.stdout.write(f"Worker {name} running up to {workers} jobs in a {options['pool']} pool.")
+        running = {}
+        last_heartbeat = time.monotonic()
+        try:
+            with executor:
+                while True:
+                    while len(running) < workers:
+                        job = jobs.claim_next(name)
+                        if job is None:
+                            break
+                        self.stdout.write(f"Started {job}.")
+                        if options['pool'] == 'process':
+                            future = executor.submit(jobs.run_job_by_id, job.pk)
+                        else:
+                            future = executor.submit(jobs.run_job, job)
+                        running[future] = job
+                    connections.close_all()
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    # Wake up at least every poll interval, even with every slot
+                    # busy, to heartbeat long jobs that report no progress.
+                    done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.report(running.pop(future), future)
+                    if running and time.monotonic() - last_heartbeat >= options['heartbeat_interval']:
+                        jobs.heartbeat(job.pk for job in running.values())
+                        connections.close_all()
+                        last_heartbeat = time.monotonic()
+        except KeyboardInterrupt:
+            # Leaving the executor's block waited for the running jobs to finish.
+            self.stdout.write('Stopped.')
+
+    def report(self, job, future):
+        try:
+            succeeded = future.result()
+        except Exception as e:
+            # The pool process died before the job could record its own outcome.
+            jobs.record_failure(job, f"The job crashed its worker process: {e!r}")
+            self.stdout.write(self.style.ERROR(f"{job.kind} #{job.pk} crashed its worker process: {e}"))
+            return
+        if succeeded:
+            self.stdout.write(self.style.SUCCESS(f"Finished {job.kind} #{job.pk}."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{job.kind} #{job.pk} failed; see its error in the admin."))
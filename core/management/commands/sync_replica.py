@@ -0,0 +1,53 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from core.models import ReplicationHeartbeat
+from core.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the replication heartbeat on the primary database and, when the '
+        'replica is a SQLite file, copy the primary into it as a local stand-in replica.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep syncing every INTERVAL seconds instead of running once',
+        )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No replica database is configured (set TMS_REPLICA_DATABASE).')
+        while True:
+            self.sync(alias)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, alias):
+        """Writes the heartbeat, then copies the primary file with the SQLite backup API"""
+        ReplicationHeartbeat.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+            pk=1, defaults={'beat_at': timezone.now()}
+        )
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES[alias]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3' or replica['ENGINE'] != 'django.db.backends.sqlite3':
+            # A real replica receives the heartbeat through replication.
+            self.stdout.write('Heartbeat written; replication is handled by the database.')
+            return
+        source = sqlite3.connect(str(primary['NAME']))
+        target = sqlite3.connect(str(replica['NAME']))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Replica '{alias}' synced from the primary database."))
@@ -0,0 +1,51 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.roster import sync_roster
+
+
+class Command(BaseCommand):
+    help = (
+        'Sync students, courses and enrolments from HR roster CSV files. Only new and '
+        'changed records are written. CSV columns are the model field names; '
+        'course_head, student and course hold serial numbers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', help='Student roster CSV file')
+        parser.add_argument('--courses', help='Course roster CSV file')
+        parser.add_argument('--enrolments', help='Course enrolment roster CSV file')
+        parser.add_argument(
+            '--deactivate-missing', action='store_true',
+            help='Set students and enrolments missing from the roster to Inactive',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the diff without saving it')
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in ('students', 'courses', 'enrolments')):
+            raise CommandError('Provide at least one of --students, --courses or --enrolments.')
+        try:
+            results = sync_roster(
+                students=self.read_csv(options['students']),
+                courses=self.read_csv(options['courses']),
+                enrolments=self.read_csv(options['enrolments']),
+                deactivate_missing=options['deactivate_missing'],
+                dry_run=options['dry_run'],
+            )
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+
+        for result in results:
+            self.stdout.write(result.report())
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no changes were saved.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Roster sync complete.'))
+
+    def read_csv(self, path):
+        if not path:
+            return None
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
@@ -0,0 +1,77 @@
+"""
+Grid-based bulk mark entry for one assessment: a course, exam type and date.
+
+The mark sheet lists every active enrolment of the course with its existing
+exam record, and save_marks() writes the whole sheet with one bulk_create and
+one bulk_update, so rendering and saving cost a fixed number of queries
+whatever the class size (up to the database's insert batch limits).
+"""
+import uuid
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .models import CourseEnrolment, Exam
+
+
+@dataclass
+class MarkSheetRow:
+    enrolment: CourseEnrolment
+    # The student's existing exam for this assessment, if any.
+    exam: Exam = None
+
+
+def load_mark_sheet(course, exam_type, exam_date):
+    """Active enrolments of ``course``, ordered by student name, with their exams (two queries)"""
+    enrolments = list(
+        CourseEnrolment.objects.filter(course=course, active_status='Active')
+        .select_related('student')
+        .order_by('student__name', 'pk')
+    )
+    exams = {}
+    for exam in Exam.objects.filter(
+        course_enrolment__course=course, exam_type=exam_type, exam_date=exam_date
+    ).order_by('-pk'):
+        # Keep the oldest record when a student has duplicates for this assessment.
+        exams[exam.course_enrolment_id] = exam
+    return [MarkSheetRow(enrolment, exams.get(enrolment.pk)) for enrolment in enrolments]
+
+
+def _new_serial_numbers(count):
+    """Exam serial numbers in ExamAdmin.save_model's format, checked against existing ones in one query"""
+    serials = set()
+    while len(serials) < count:
+        candidates = {f"EXM{uuid.uuid4().hex[:6].upper()}" for _ in range(count - len(serials))}
+        taken = set(Exam.objects.filter(serial_number__in=candidates).values_list('serial_number', flat=True))
+        serials |= candidates - taken
+    return list(serials)
+
+
+def save_marks(rows, marks, total_marks, exam_type, exam_date):
+    """
+    Saves ``marks`` (enrolment pk -> obtained marks, None to leave a student out)
+    for the mark sheet ``rows``. Returns the number of exams created and updated.
+    """
+    to_create, to_update = [], []
+    for row in rows:
+        obtained = marks.get(row.enrolment.pk)
+        if obtained is None:
+            continue
+        if row.exam is None:
+            to_create.append(Exam(
+                course_enrolment=row.enrolment,
+                exam_type=exam_type,
+                exam_date=exam_date,
+                total_marks=total_marks,
+                obtained_marks=obtained,
+            ))
+        elif row.exam.obtained_marks != obtained or row.exam.total_marks != total_marks:
+            row.exam.obtained_marks = obtained
+            row.exam.total_marks = total_marks
+            to_update.append(row.exam)
+    with transaction.atomic():
+        for exam, serial_number in zip(to_create, _new_serial_numbers(len(to_create))):
+            exam.serial_number = serial_number
+        Exam.objects.bulk_create(to_create)
+        Exam.objects.bulk_update(to_update, ['obtained_marks', 'total_marks'])
+    return len(to_create), len(to_update)
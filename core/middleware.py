@@ -0,0 +1,26 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import routers
+
+
+class ReplicaPinMiddleware:
+    """
+    Provides read-your-writes consistency for replica routing: a request that
+    writes to the primary (e.g. through ModelAdmin.save_model or a bulk action)
+    pins its session to the primary for the next ``TMS_REPLICA_PIN_SECONDS``.
+
+    Must come after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if routers.replica_alias() is None:
+            return self.get_response(request)
+        tracker = routers.WriteTracker()
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(tracker):
+            response = self.get_response(request)
+        if tracker.wrote:
+            routers.pin_to_primary(request)
+        return response
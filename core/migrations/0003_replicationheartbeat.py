@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_courseenrolment_active_status_exam_active_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReplicationHeartbeat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("beat_at", models.DateTimeField()),
+            ],
+        ),
+    ]
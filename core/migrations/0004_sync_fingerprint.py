@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_replicationheartbeat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="sync_fingerprint",
+            field=models.CharField(blank=True, default="", editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name="courseenrolment",
+            name="sync_fingerprint",
+            field=models.CharField(blank=True, default="", editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name="student",
+            name="sync_fingerprint",
+            field=models.CharField(blank=True, default="", editable=False, max_length=40),
+        ),
+    ]
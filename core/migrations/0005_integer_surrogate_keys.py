@@ -0,0 +1,164 @@
+# Replaces the CharField serial_number primary keys with integer surrogate keys.
+#
+# serial_number stays as a unique (indexed) business key. Existing rows are
+# numbered in serial_number order and foreign keys are remapped in batches
+# before the old string columns are dropped. Not reversible.
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+# (model, field) pairs of the foreign keys being remapped, with their target model.
+FOREIGN_KEYS = [
+    ("course", "course_head", "student"),
+    ("courseenrolment", "student", "student"),
+    ("courseenrolment", "course", "course"),
+    ("exam", "course_enrolment", "courseenrolment"),
+]
+
+
+def _batches(values):
+    for start in range(0, len(values), BATCH_SIZE):
+        yield values[start:start + BATCH_SIZE]
+
+
+def number_rows(apps, schema_editor):
+    """Assigns new_id = 1..n to every row, in serial_number order"""
+    for model_name in ("student", "course", "courseenrolment", "exam"):
+        model = apps.get_model("core", model_name)
+        serials = list(model.objects.order_by("serial_number").values_list("serial_number", flat=True))
+        next_id = 1
+        for batch in _batches(serials):
+            objs = []
+            for serial in batch:
+                objs.append(model(serial_number=serial, new_id=next_id))
+                next_id += 1
+            model.objects.bulk_update(objs, ["new_id"])
+
+
+def remap_foreign_keys(apps, schema_editor):
+    """Copies each target's new_id into the <field>_ref column, in batches"""
+    for model_name, field_name, target_name in FOREIGN_KEYS:
+        model = apps.get_model("core", model_name)
+        target = apps.get_model("core", target_name)
+        serials = list(model.objects.order_by("serial_number").values_list("serial_number", flat=True))
+        new_ids = target.objects.filter(serial_number=OuterRef(f"{field_name}_id")).values("new_id")[:1]
+        for batch in _batches(serials):
+            model.objects.filter(serial_number__in=batch).update(**{f"{field_name}_ref": Subquery(new_ids)})
+
+
+def remap_log_entries(apps, schema_editor):
+    """Points admin history entries at the new primary keys, in batches"""
+    LogEntry = apps.get_model("admin", "LogEntry")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for model_name in ("student", "course", "courseenrolment", "exam"):
+        content_type = ContentType.objects.filter(app_label="core", model=model_name).first()
+        if content_type is None:
+            continue
+        model = apps.get_model("core", model_name)
+        new_ids = dict(model.objects.values_list("serial_number", "new_id"))
+        entries = list(LogEntry.objects.filter(content_type=content_type).values_list("pk", "object_id"))
+        for batch in _batches(entries):
+            objs = [
+                LogEntry(pk=pk, object_id=str(new_ids[object_id]))
+                for pk, object_id in batch
+                if object_id in new_ids
+            ]
+            LogEntry.objects.bulk_update(objs, ["object_id"])
+
+
+def promote_primary_key(model_name):
+    """Makes new_id the primary key and serial_number a unique business key"""
+    return [
+        migrations.AlterField(
+            model_name=model_name,
+            name="new_id",
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID"),
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name="serial_number",
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.RenameField(model_name=model_name, old_name="new_id", new_name="id"),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin", "0003_logentry_add_action_flag_choices"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("core", "0004_sync_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(name="courseenrolment", unique_together=set()),
+        *[
+            migrations.AddField(model_name=model_name, name="new_id", field=models.BigIntegerField(null=True))
+            for model_name in ("student", "course", "courseenrolment", "exam")
+        ],
+        *[
+            migrations.AddField(
+                model_name=model_name, name=f"{field_name}_ref", field=models.BigIntegerField(null=True)
+            )
+            for model_name, field_name, _ in FOREIGN_KEYS
+        ],
+        migrations.RunPython(number_rows),
+        migrations.RunPython(remap_foreign_keys),
+        migrations.RunPython(remap_log_entries),
+        *[
+            migrations.RemoveField(model_name=model_name, name=field_name)
+            for model_name, field_name, _ in FOREIGN_KEYS
+        ],
+        *promote_primary_key("exam"),
+        *promote_primary_key("courseenrolment"),
+        *promote_primary_key("course"),
+        *promote_primary_key("student"),
+        *[
+            migrations.RenameField(model_name=model_name, old_name=f"{field_name}_ref", new_name=field_name)
+            for model_name, field_name, _ in FOREIGN_KEYS
+        ],
+        migrations.AlterField(
+            model_name="course",
+            name="course_head",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="courses_headed",
+                to="core.student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="courseenrolment",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="enrolments",
+                to="core.student",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="courseenrolment",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="enrolments",
+                to="core.course",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="exam",
+            name="course_enrolment",
+            field=models.ForeignKey(
+                help_text="Links to the specific student-course enrolment.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="exams",
+                to="core.courseenrolment",
+            ),
+        ),
+        migrations.AlterUniqueTogether(name="courseenrolment", unique_together={("student", "course")}),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_integer_surrogate_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(max_length=50)),
+                ("object_id", models.BigIntegerField()),
+                ("serial_number", models.CharField(max_length=20)),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="courseenrolment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="exam",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="student",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(fields=["updated_at", "id"], name="core_course_updated_957569_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="courseenrolment",
+            index=models.Index(fields=["updated_at", "id"], name="core_course_updated_066a49_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="exam",
+            index=models.Index(fields=["updated_at", "id"], name="core_exam_updated_a12115_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["updated_at", "id"], name="core_studen_updated_bbcf8a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["model", "id"], name="core_tombst_model_34d7c2_idx"),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Define choices for the Student Status field
 STUDENT_STATUS_CHOICES = [
@@ -21,6 +23,15 @@ ACTIVE_STATUS_CHOICES = [
     ('Inactive', 'Inactive'),
 ]
 
+# Define choices for the Job Status field
+JOB_STATUS_CHOICES = [
+    ('Queued', 'Queued'),
+    ('Running', 'Running'),
+    ('Succeeded', 'Succeeded'),
+    ('Failed', 'Failed'),
+    ('Cancelled', 'Cancelled'),
+]
+
 # Define choices for the Exam Type field
 EXAM_TYPE_CHOICES = [
     ('Quiz', 'Quiz'),
@@ -28,13 +39,36 @@ EXAM_TYPE_CHOICES = [
     # Add more as needed
 ]
 
+class TrackedQuerySet(models.QuerySet):
+    """
+    Keeps ``updated_at`` correct on bulk paths, which bypass ``auto_now``:
+    update() and bulk_update() stamp the current time unless told otherwise.
+    Deletion cascades do not go through it; see core.signals.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = list(fields)
+        if 'updated_at' not in fields:
+            fields.append('updated_at')
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+
 # 1. Student Model
 class Student(models.Model):
     """
     Captures comprehensive information about each student.
     """
-    # Serial Number: A unique identifier for the student.
-    serial_number = models.CharField(max_length=20, unique=True, primary_key=True)
+    # Serial Number: The student's business identifier, used in admin URLs.
+    # The primary key is an integer surrogate key so foreign keys stay compact.
+    serial_number = models.CharField(max_length=20, unique=True)
     # Name: The student's full name.
     name = models.CharField(max_length=100)
     # Father's Name: The student's father's name.
@@ -53,6 +87,15 @@ class Student(models.Model):
     address = models.TextField()
     # Status: Indicates whether the student is currently active or inactive in the TMS.
     status = models.CharField(max_length=10, choices=STUDENT_STATUS_CHOICES, default='Active')
+    # Sync Fingerprint: Hash of the record as last imported by the roster sync (see core.roster).
+    sync_fingerprint = models.CharField(max_length=40, blank=True, default='', editable=False)
+    # Updated At: When the record was last created or modified, for incremental change feeds.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
     def __str__(self):
         return self.name
@@ -62,8 +105,8 @@ class Course(models.Model):
     """
     Defines the details of each course offered.
     """
-    # Serial Number: A unique identifier for the course.
-    serial_number = models.CharField(max_length=20, unique=True, primary_key=True)
+    # Serial Number: The course's business identifier, used in admin URLs.
+    serial_number = models.CharField(max_length=20, unique=True)
     # Course Name: The official name of the course.
     course_name = models.CharField(max_length=150)
     # Course Link: A URL or link related to the course content.
@@ -79,6 +122,15 @@ class Course(models.Model):
         null=True,
         blank=True
     )
+    # Sync Fingerprint: Hash of the record as last imported by the roster sync (see core.roster).
+    sync_fingerprint = models.CharField(max_length=40, blank=True, default='', editable=False)
+    # Updated At: When the record was last created or modified, for incremental change feeds.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
     def __str__(self):
         return self.course_name
@@ -88,8 +140,8 @@ class CourseEnrolment(models.Model):
     """
     Tracks the enrolment of students in specific courses.
     """
-    # Serial Number: A unique identifier for the enrolment record.
-    serial_number = models.CharField(max_length=20, unique=True, primary_key=True)
+    # Serial Number: The enrolment's business identifier (e.g. STU001_CRS001).
+    serial_number = models.CharField(max_length=20, unique=True)
     # Student: A foreign key linking to the Student model, identifying the enrolled student.
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='enrolments')
     # Course: A foreign key linking to the Course model, identifying the enrolled course.
@@ -111,12 +163,19 @@ class CourseEnrolment(models.Model):
     status = models.CharField(max_length=50, choices=ENROLMENT_STATUS_CHOICES)
     # Active Status: Indicates whether the enrolment is currently active or inactive.
     active_status = models.CharField(max_length=10, choices=ACTIVE_STATUS_CHOICES, default='Active')
+    # Sync Fingerprint: Hash of the record as last imported by the roster sync (see core.roster).
+    sync_fingerprint = models.CharField(max_length=40, blank=True, default='', editable=False)
+    # Updated At: When the record was last created or modified, for incremental change feeds.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
 
     class Meta:
         # Ensures a student can only be enrolled in a course once (based on FK combination)
-        # although the serial_number being primary_key already ensures uniqueness for the record.
+        # although the unique serial_number already ensures uniqueness for the record.
         # This is for semantic uniqueness of the relationship.
         unique_together = ('student', 'course')
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
     @property
     def extra_time(self):
@@ -137,8 +196,8 @@ class Exam(models.Model):
     """
     Records details of exams taken by students in their enrolled courses.
     """
-    # Serial Number: A unique identifier for the exam record.
-    serial_number = models.CharField(max_length=20, unique=True, primary_key=True)
+    # Serial Number: The exam record's business identifier.
+    serial_number = models.CharField(max_length=20, unique=True)
     # Course Enrolment: A foreign key linking to the Course Enrolment model.
     course_enrolment = models.ForeignKey(
         CourseEnrolment,
@@ -156,6 +215,10 @@ class Exam(models.Model):
     obtained_marks = models.DecimalField(max_digits=5, decimal_places=2)
     # Active Status: Indicates whether the exam record is currently active or inactive.
     active_status = models.CharField(max_length=10, choices=ACTIVE_STATUS_CHOICES, default='Active')
+    # Updated At: When the record was last created or modified, for incremental change feeds.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TrackedQuerySet.as_manager()
     # Result in Percentage: The student's exam result, expressed as a percentage.
     # This will be calculated in the application logic or as a model property.
     # For data integrity, we'll make sure obtained_marks <= total_marks
@@ -166,6 +229,7 @@ class Exam(models.Model):
                 name='obtained_lte_total_marks'
             )
         ]
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
     @property
     def result_in_percentage(self):
@@ -177,4 +241,100 @@ class Exam(models.Model):
         return 0.0
 
     def __str__(self):
-        return f"{self.exam_type} for {self.course_enrolment.student.name} in {self.course_enrolment.course.course_name}"
\ No newline at end of file
+        return f"{self.exam_type} for {self.course_enrolment.student.name} in {self.course_enrolment.course.course_name}"
+
+# 5. Replication Heartbeat Model
+class ReplicationHeartbeat(models.Model):
+    """
+    A single row refreshed on the primary database and replicated with the rest
+    of the data. Comparing it to the current time on the replica gives the
+    replication lag used by core.routers.ReplicaRouter.
+    """
+    # Beat At: When the primary last refreshed the heartbeat.
+    beat_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Heartbeat at {self.beat_at}"
+
+
+
+# 6. Tombstone Model
+class Tombstone(models.Model):
+    """
+    Records the deletion of a core record so change feed consumers can remove
+    it downstream. The auto-incrementing id orders tombstones for cursors.
+    """
+    # Model: The deleted record's model label, e.g. core.student.
+    model = models.CharField(max_length=50)
+    # Object ID: The deleted record's primary key.
+    object_id = models.BigIntegerField()
+    # Serial Number: The deleted record's business identifier.
+    serial_number = models.CharField(max_length=20)
+    # Deleted At: When the record was deleted.
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'id'])]
+
+    def __str__(self):
+        return f"{self.model} {self.serial_number} deleted at {self.deleted_at}"
+
+
+
+# 7. Job Model
+class Job(models.Model):
+    """
+    A unit of background work (export, report, import) run by the
+    `run_jobs` worker instead of inside an HTTP request. See core.jobs.
+    """
+    # Kind: The registered handler that runs the job, e.g. export_csv.
+    kind = models.CharField(max_length=50)
+    # Payload: The handler's arguments.
+    payload = models.JSONField(default=dict, blank=True)
+    # Priority: Jobs with a higher priority are run first.
+    priority = models.IntegerField(default=0)
+    # Status: Where the job is in its lifecycle.
+    status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default='Queued')
+    # Attempts: How many times the job has been started; failed jobs are retried up to Max Attempts.
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Run After: The job is not started before this time (used for retry backoff).
+    run_after = models.DateTimeField(default=timezone.now)
+    # Progress: Units of work done out of the total, with an optional message.
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=200, blank=True)
+    # Result File: The downloadable output of the job, if any.
+    result_file = models.FileField(upload_to='jobs/', blank=True)
+    # Error: The traceback of the last failed attempt.
+    error = models.TextField(blank=True)
+    # Worker: The worker running (or that last ran) the job.
+    worker = models.CharField(max_length=100, blank=True)
+    # Created By: The user who queued the job, if any.
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='jobs',
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Heartbeat At: Refreshed while the job runs, so jobs of dead workers can be requeued.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'priority', 'run_after'])]
+
+    @property
+    def progress_percentage(self):
+        if self.status == 'Succeeded':
+            return 100.0
+        if self.progress_total:
+            return min(self.progress_done * 100 / self.progress_total, 100.0)
+        return None
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,241 @@
+"""
+Idempotent, diff-based roster sync.
+
+Each incoming record is fingerprinted and compared against the fingerprint
+stored on the matching row (``sync_fingerprint``) from the previous sync.
+Unchanged records are skipped without being loaded, so apart from one
+``values_list`` scan of stored fingerprints the work done grows with the number
+of changes, not with the size of the roster:
+
+* new records are inserted with ``bulk_create``;
+* changed records are loaded with ``in_bulk`` and written with ``bulk_update``
+  of just the fields that differ;
+* optionally, records missing from the roster are deactivated (never deleted).
+"""
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Student, Course, CourseEnrolment
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class RosterSpec:
+    """How one model is synced from roster records"""
+    model: type
+    # Fields compared and written by the sync, in fingerprint order.
+    fields: tuple
+    # Foreign keys given by the related record's serial number.
+    foreign_keys: dict = field(default_factory=dict)
+    # Field set to 'Inactive' for records missing from the roster, if any.
+    deactivate_field: str = None
+
+
+STUDENT_SPEC = RosterSpec(
+    model=Student,
+    fields=(
+        'name', 'father_name', 'cnic', 'email', 'contact_number', 'joining_date',
+        'resignation_date', 'address', 'status',
+    ),
+    deactivate_field='status',
+)
+
+COURSE_SPEC = RosterSpec(
+    model=Course,
+    fields=('course_name', 'course_link', 'course_duration_hours', 'course_head'),
+    foreign_keys={'course_head': Student},
+)
+
+ENROLMENT_SPEC = RosterSpec(
+    model=CourseEnrolment,
+    fields=('student', 'course', 'enrolment_date', 'deadline', 'completion_date', 'status', 'active_status'),
+    foreign_keys={'student': Student, 'course': Course},
+    deactivate_field='active_status',
+)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing one model; ``changes`` maps serial numbers to {field: (old, new)}"""
+    model: type
+    created: list = field(default_factory=list)
+    changes: dict = field(default_factory=dict)
+    deactivated: list = field(default_factory=list)
+    unchanged: int = 0
+
+    def report(self):
+        """Human readable diff, one line per affected record"""
+        name = self.model._meta.verbose_name_plural
+        lines = [
+            f"{name}: {len(self.created)} new, {len(self.changes)} changed, "
+            f"{len(self.deactivated)} deactivated, {self.unchanged} unchanged"
+        ]
+        lines += [f"  + {serial}" for serial in self.created]
+        for serial, diff in self.changes.items():
+            details = ', '.join(f"{attname}: {old!r} -> {new!r}" for attname, (old, new) in diff.items())
+            lines.append(f"  ~ {serial}: {details}")
+        lines += [f"  - {serial}" for serial in self.deactivated]
+        return '\n'.join(lines)
+
+
+def fingerprint(values):
+    """SHA-1 of the record's canonical field values, in spec order"""
+    canonical = '\x1f'.join('' if value is None else str(value) for value in values)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _clean(spec, record):
+    """Converts a raw roster record (strings) to model values, keyed by field name"""
+    values = {}
+    for name in spec.fields:
+        raw = record.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw == '':
+            raw = None
+        if name in spec.foreign_keys:
+            values[name] = raw
+            continue
+        model_field = spec.model._meta.get_field(name)
+        if raw is None and model_field.has_default():
+            raw = model_field.get_default()
+        try:
+            values[name] = model_field.to_python(raw)
+        except ValidationError as e:
+            raise ValidationError(f"{record.get('serial_number')}: {name}: {'; '.join(e.messages)}")
+    return values
+
+
+def _serial_number(spec, record):
+    serial = (record.get('serial_number') or '').strip()
+    if not serial and spec.model is CourseEnrolment:
+        # Same convention as CourseEnrolmentAdmin.save_model.
+        serial = f"{record['student'].strip()}_{record['course'].strip()}"
+    if not serial:
+        raise ValidationError(f"{spec.model._meta.verbose_name} record without serial_number: {record}")
+    return serial
+
+
+def _related_keys(spec, incoming):
+    """Maps referenced serial numbers to primary keys, one query per foreign key"""
+    keys = {}
+    for name, related_model in spec.foreign_keys.items():
+        serials = {values[name] for values, _ in incoming.values() if values[name] is not None}
+        keys[name] = dict(
+            related_model.objects.filter(serial_number__in=serials).values_list('serial_number', 'pk')
+        )
+        missing = serials - keys[name].keys()
+        if missing:
+            raise ValidationError(
+                f"Unknown {related_model._meta.verbose_name} serial numbers for {name}: {', '.join(sorted(missing))}"
+            )
+    return keys
+
+
+def _model_values(spec, values, related_keys):
+    """Field values as attribute assignments, with foreign keys resolved to primary keys"""
+    assigned = {}
+    for name in spec.fields:
+        if name in spec.foreign_keys:
+            serial = values[name]
+            assigned[spec.model._meta.get_field(name).attname] = (
+                None if serial is None else related_keys[name][serial]
+            )
+        else:
+            assigned[name] = values[name]
+    return assigned
+
+
+def sync_model(spec, records, deactivate_missing=False):
+    """
+    Syncs ``records`` (dicts of field name to raw value, foreign keys given as
+    serial numbers) into ``spec.model`` and returns a SyncResult.
+    """
+    model = spec.model
+    result = SyncResult(model)
+    incoming = {}
+    for record in records:
+        values = _clean(spec, record)
+        incoming[_serial_number(spec, record)] = (
+            values, fingerprint(values[name] for name in spec.fields)
+        )
+
+    deactivate_field = spec.deactivate_field if deactivate_missing else None
+    stored = {}
+    active = set()
+    stored_fields = ['serial_number', 'sync_fingerprint', *filter(None, [deactivate_field])]
+    for serial, stored_fingerprint, *status in model.objects.values_list(*stored_fields):
+        stored[serial] = stored_fingerprint
+        if status and status[0] == 'Active':
+            active.add(serial)
+    new_serials = [serial for serial in incoming if serial not in stored]
+    changed_serials = [
+        serial for serial in incoming
+        if serial in stored and stored[serial] != incoming[serial][1]
+    ]
+    result.created = new_serials
+    related_keys = _related_keys(spec, {
+        serial: incoming[serial] for serial in new_serials + changed_serials
+    })
+
+    # Load only the changed rows and work out which of their fields differ.
+    to_update = defaultdict(list)
+    existing = model.objects.filter(serial_number__in=changed_serials).in_bulk(field_name='serial_number')
+    for serial in changed_serials:
+        obj = existing[serial]
+        values, new_fingerprint = incoming[serial]
+        diff = {}
+        for attname, value in _model_values(spec, values, related_keys).items():
+            if getattr(obj, attname) != value:
+                diff[attname] = (getattr(obj, attname), value)
+                setattr(obj, attname, value)
+        obj.sync_fingerprint = new_fingerprint
+        if diff:
+            result.changes[serial] = diff
+        to_update[frozenset(diff)].append(obj)
+    result.unchanged = len(incoming) - len(new_serials) - len(result.changes)
+
+    to_deactivate = sorted(active - incoming.keys())
+    result.deactivated = to_deactivate
+
+    with transaction.atomic():
+        model.objects.bulk_create([
+            model(
+                serial_number=serial,
+                sync_fingerprint=incoming[serial][1],
+                **_model_values(spec, incoming[serial][0], related_keys),
+            )
+            for serial in new_serials
+        ], batch_size=BATCH_SIZE)
+        for fields, objs in to_update.items():
+            model.objects.bulk_update(objs, [*fields, 'sync_fingerprint'], batch_size=BATCH_SIZE)
+        for start in range(0, len(to_deactivate), BATCH_SIZE):
+            # Clear the fingerprint so a record that reappears unchanged is
+            # re-diffed, and reactivated, by the next sync.
+            model.objects.filter(serial_number__in=to_deactivate[start:start + BATCH_SIZE]).update(
+                **{deactivate_field: 'Inactive'}, sync_fingerprint='',
+            )
+    return result
+
+
+def sync_roster(students=None, courses=None, enrolments=None, deactivate_missing=False, dry_run=False):
+    """
+    Syncs students, courses and enrolments (in dependency order) in one
+    transaction. Models whose records are None are left untouched.
+
+    A dry run applies the changes and rolls them back, so the reported diff
+    accounts for records that depend on others created in the same run.
+    """
+    results = []
+    with transaction.atomic():
+        for spec, records in ((STUDENT_SPEC, students), (COURSE_SPEC, courses), (ENROLMENT_SPEC, enrolments)):
+            if records is not None:
+                results.append(sync_model(spec, records, deactivate_missing))
+        if dry_run:
+            transaction.set_rollback(True)
+    return results
@@ -0,0 +1,172 @@
+"""
+Read-replica database routing.
+
+Read-only traffic (changelists, exports, reports and the JSON read paths) can
+be sent to a replica database configured under ``TMS_REPLICA_ALIAS``. Reads are
+only routed to the replica inside ``replica_reads()``; everything else, and
+every write, stays on the primary.
+
+Two safeguards keep results consistent:
+
+* Read-your-writes: when a request writes to the primary, including bulk
+  inserts and updates that send no model signals, the session is pinned to the
+  primary for ``TMS_REPLICA_PIN_SECONDS`` (see ReplicaPinMiddleware).
+* Lag fallback: the replica's copy of ReplicationHeartbeat is compared with the
+  current time, and the primary is used whenever it lags by more than
+  ``TMS_REPLICA_MAX_LAG_SECONDS`` or cannot be checked.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import HttpRequest
+from django.utils import timezone
+
+# Session key holding the time (epoch seconds) until which reads stay on the primary.
+PIN_SESSION_KEY = '_tms_replica_pinned_until'
+
+# SQL statements that modify data, as opposed to reads and transaction control.
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_replica_reads = ContextVar('tms_replica_reads', default=False)
+
+_lag_lock = threading.Lock()
+_lag_cache = {'checked_at': 0.0, 'healthy': False}
+
+
+def replica_alias():
+    """The configured replica alias, or None when no replica database exists"""
+    alias = getattr(settings, 'TMS_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_lag():
+    """
+    Seconds since the heartbeat visible on the replica was written, or None if
+    there is no replica or the heartbeat cannot be read.
+    """
+    from .models import ReplicationHeartbeat
+
+    alias = replica_alias()
+    if alias is None:
+        return None
+    try:
+        beat_at = (
+            ReplicationHeartbeat.objects.using(alias)
+            .order_by('-beat_at')
+            .values_list('beat_at', flat=True)
+            .first()
+        )
+    except DatabaseError:
+        return None
+    if beat_at is None:
+        return None
+    return max((timezone.now() - beat_at).total_seconds(), 0.0)
+
+
+def replica_is_healthy():
+    """
+    Whether the replica is close enough to the primary to serve reads. The
+    result is cached for ``TMS_REPLICA_LAG_CHECK_SECONDS``.
+    """
+    now = time.monotonic()
+    interval = getattr(settings, 'TMS_REPLICA_LAG_CHECK_SECONDS', 5)
+    with _lag_lock:
+        if now - _lag_cache['checked_at'] < interval:
+            return _lag_cache['healthy']
+    lag = replica_lag()
+    healthy = lag is not None and lag <= getattr(settings, 'TMS_REPLICA_MAX_LAG_SECONDS', 30)
+    with _lag_lock:
+        _lag_cache.update(checked_at=now, healthy=healthy)
+    return healthy
+
+
+def is_pinned_to_primary(request):
+    """Whether this request's session wrote recently enough to need the primary"""
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    return session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def pin_to_primary(request):
+    """Keeps the session's reads on the primary for the read-your-writes window"""
+    session = getattr(request, 'session', None)
+    if session is not None:
+        session[PIN_SESSION_KEY] = time.time() + getattr(settings, 'TMS_REPLICA_PIN_SECONDS', 60)
+
+
+@contextmanager
+def replica_reads(request=None):
+    """
+    Routes reads of replicated apps to the replica for the duration of the
+    block, unless the session given by ``request`` has just written.
+    """
+    enabled = replica_alias() is not None and not (request is not None and is_pinned_to_primary(request))
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_read_view(view_func):
+    """Decorator running a read-only view (or ModelAdmin view method) under replica_reads()"""
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, HttpRequest))
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(*args, **kwargs)
+        with replica_reads(request):
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+class WriteTracker:
+    """
+    Database execute wrapper that records whether any data-modifying statement
+    ran on the connection it is installed on.
+    """
+
+    def __init__(self):
+        self.wrote = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self.wrote and sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            self.wrote = True
+        return execute(sql, params, many, context)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of ``TMS_REPLICA_APPS`` to the replica inside replica_reads(),
+    and everything else to the primary. The replica is never migrated directly;
+    it receives its schema through replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        if model._meta.app_label not in getattr(settings, 'TMS_REPLICA_APPS', ['core']):
+            return None
+        # Reads inside a write transaction must see that transaction's data.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if not replica_is_healthy():
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
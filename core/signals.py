@@ -0,0 +1,75 @@
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import backends, dashboard
+from .models import Student, Course, CourseEnrolment, Exam, Job, Tombstone
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Covers profile, password, is_active/is_staff and is_superuser changes"""
+    backends.invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_cached_permissions_on_assignment(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        backends.invalidate_permissions()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_cached_permissions(sender, **kwargs):
+    backends.invalidate_permissions()
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=CourseEnrolment)
+@receiver(post_delete, sender=Exam)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Record deletions, including cascades and queryset deletes, for the change feed"""
+    Tombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        serial_number=instance.serial_number,
+    )
+
+
+@receiver(pre_delete, sender=Student)
+def touch_headed_courses(sender, instance, using, **kwargs):
+    """
+    Deleting a course head sets Course.course_head to NULL with an UPDATE that
+    bypasses TrackedQuerySet, so the change feed would miss those courses.
+    """
+    Course.objects.using(using).filter(course_head=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CourseEnrolment)
+@receiver(post_delete, sender=CourseEnrolment)
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_dashboard(sender, **kwargs):
+    """Bulk updates send no signals; the dashboard's cache timeout covers those"""
+    dashboard.invalidate_model(sender)
+
+
+@receiver(post_save, sender=LogEntry)
+def invalidate_recent_actions(sender, instance, **kwargs):
+    dashboard.invalidate_recent_actions(instance.user_id)
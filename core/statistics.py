@@ -0,0 +1,179 @@
+"""
+Vectorized exam statistics.
+
+``Exam.result_in_percentage`` is convenient for a single record, but computing
+distributions over a whole course that way builds one model instance and one
+``Decimal`` division per exam. The helpers here pull the marks as flat columns
+with ``values_list`` and compute everything with NumPy batch operations.
+"""
+from collections import namedtuple
+
+import numpy as np
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .models import Exam
+
+# Minimum percentage an exam must reach to count as a pass.
+PASS_PERCENTAGE = 50.0
+
+# Quantiles reported by summarize(), as (label, fraction) pairs.
+QUANTILES = (('p10', 0.10), ('p25', 0.25), ('p50', 0.50), ('p75', 0.75), ('p90', 0.90))
+
+# Methods accepted by normalize_marks().
+NORMALIZATION_METHODS = ('percentage', 'zscore')
+
+ExamColumns = namedtuple('ExamColumns', ['total_marks', 'obtained_marks', 'exam_type', 'course'])
+
+
+def exam_columns(queryset=None):
+    """
+    Fetches ``(total_marks, obtained_marks, exam_type, course)`` for every exam
+    in ``queryset`` as NumPy arrays, in a single query.
+
+    Marks are cast to floats in SQL so no ``Decimal`` objects are built.
+    """
+    if queryset is None:
+        queryset = Exam.objects.all()
+    rows = queryset.annotate(
+        total_marks_float=Cast(F('total_marks'), FloatField()),
+        obtained_marks_float=Cast(F('obtained_marks'), FloatField()),
+    ).values_list(
+        'total_marks_float', 'obtained_marks_float', 'exam_type', 'course_enrolment__course_id'
+    ).order_by()
+    rows = list(rows)
+    if not rows:
+        return ExamColumns(
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=object),
+            np.empty(0, dtype=np.int64),
+        )
+    total_marks, obtained_marks, exam_types, courses = zip(*rows)
+    return ExamColumns(
+        np.asarray(total_marks, dtype=np.float64),
+        np.asarray(obtained_marks, dtype=np.float64),
+        np.asarray(exam_types, dtype=object),
+        np.asarray(courses, dtype=np.int64),
+    )
+
+
+def percentages(columns):
+    """
+    Vectorized equivalent of ``Exam.result_in_percentage``: exams without a
+    positive total score 0.
+    """
+    total = columns.total_marks
+    result = np.zeros_like(total)
+    np.divide(columns.obtained_marks * 100.0, total, out=result, where=total > 0)
+    return result
+
+
+def normalize_marks(columns, method='zscore'):
+    """
+    Puts marks from exams with different totals on a common scale.
+
+    ``method='percentage'`` rescales every exam to 100 marks; ``'zscore'``
+    additionally standardizes the percentages within each exam type, so a
+    quiz and a practical can be compared directly.
+    """
+    result = percentages(columns)
+    if method == 'percentage':
+        return result
+    if method not in NORMALIZATION_METHODS:
+        raise ValueError(f"Unknown normalization method: {method!r}")
+    normalized = np.zeros_like(result)
+    if not len(result):
+        return normalized
+    types, inverse = np.unique(columns.exam_type.astype(str), return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(types))
+    means = np.bincount(inverse, weights=result, minlength=len(types)) / counts
+    deviations = result - means[inverse]
+    stds = np.sqrt(np.bincount(inverse, weights=deviations ** 2, minlength=len(types)) / counts)
+    np.divide(deviations, stds[inverse], out=normalized, where=stds[inverse] > 0)
+    return normalized
+
+
+def _describe(values, pass_percentage):
+    """Count, mean, spread and pass rate of an array of percentages."""
+    if not len(values):
+        return {'count': 0, 'mean': None, 'std': None, 'min': None, 'max': None, 'pass_rate': None}
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'pass_rate': float((values >= pass_percentage).mean() * 100),
+    }
+
+
+def _quantiles(values):
+    if not len(values):
+        return {label: None for label, _ in QUANTILES}
+    points = np.quantile(values, [fraction for _, fraction in QUANTILES])
+    return {label: float(point) for (label, _), point in zip(QUANTILES, points)}
+
+
+def summarize(columns, bins=10, pass_percentage=PASS_PERCENTAGE, normalize=None):
+    """
+    Computes the grade distribution of ``columns``: descriptive statistics,
+    quantiles, a histogram of percentages over ``bins`` equal-width buckets
+    between 0 and 100, and a per-exam-type breakdown.
+
+    With ``normalize`` (a normalize_marks() method), the summary also holds
+    the spread and quantiles of the normalized marks.
+    """
+    values = percentages(columns)
+    summary = _describe(values, pass_percentage)
+    summary['quantiles'] = _quantiles(values)
+    counts, edges = np.histogram(np.clip(values, 0, 100), bins=bins, range=(0, 100))
+    summary['histogram'] = {
+        'edges': [float(edge) for edge in edges],
+        'counts': [int(count) for count in counts],
+    }
+    summary['by_exam_type'] = {}
+    if len(values):
+        exam_types = columns.exam_type.astype(str)
+        for exam_type in np.unique(exam_types):
+            summary['by_exam_type'][str(exam_type)] = _describe(
+                values[exam_types == exam_type], pass_percentage
+            )
+    if normalize is not None:
+        normalized = normalize_marks(columns, normalize)
+        spread = _describe(normalized, pass_percentage)
+        del spread['pass_rate']
+        summary['normalized'] = {'method': normalize, **spread, 'quantiles': _quantiles(normalized)}
+    return summary
+
+
+def course_statistics(course, bins=10, pass_percentage=PASS_PERCENTAGE, include_inactive=False, normalize=None):
+    """
+    Grade distribution of all exams taken in ``course`` (a Course instance or
+    its primary key). Inactive exams and enrolments are skipped by default.
+    See summarize() for ``normalize``.
+    """
+    queryset = Exam.objects.filter(course_enrolment__course=course)
+    if not include_inactive:
+        queryset = queryset.filter(active_status='Active', course_enrolment__active_status='Active')
+    return summarize(exam_columns(queryset), bins=bins, pass_percentage=pass_percentage, normalize=normalize)
+
+
+def statistics_by_course(queryset=None, pass_percentage=PASS_PERCENTAGE, columns=None):
+    """
+    Descriptive statistics for every course present in ``queryset``, keyed by
+    course primary key, computed from one query. Pass ``columns`` already
+    fetched with exam_columns() instead to reuse them without a query.
+    """
+    if columns is None:
+        columns = exam_columns(queryset)
+    values = percentages(columns)
+    result = {}
+    if not len(values):
+        return result
+    courses = columns.course
+    order = np.argsort(courses, kind='stable')
+    keys, starts = np.unique(courses[order], return_index=True)
+    for key, group in zip(keys, np.split(values[order], starts[1:])):
+        result[int(key)] = _describe(group, pass_percentage)
+    return result
@@ -0,0 +1,17 @@
+from django import template
+
+from core import dashboard
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def admin_dashboard(context):
+    """Cached dashboard data for the admin index (see core.dashboard)"""
+    return dashboard.get_dashboard(context.get('request'))
+
+
+@register.simple_tag(takes_context=True)
+def recent_actions(context, limit=10):
+    """Cached replacement for the admin's get_admin_log tag"""
+    return dashboard.get_recent_actions(context['request'].user, limit)
@@ -1,3 +1,507 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.models import LogEntry
+from django.contrib.admin.utils import quote
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import backends, changefeed, jobs, roster, statistics
+from .models import Student, Course, CourseEnrolment, Exam, Job
+
+
+def student_record(serial, **overrides):
+    record = {
+        'serial_number': serial,
+        'name': f"Student {serial}",
+        'father_name': 'Father',
+        'cnic': f"00000-{serial}-0",
+        'email': f"{serial.lower()}@example.com",
+        'contact_number': '0300',
+        'joining_date': '2024-01-01',
+        'resignation_date': '',
+        'address': 'Address',
+        'status': 'Active',
+    }
+    record.update(overrides)
+    return record
+
+
+def create_student(serial, **overrides):
+    return Student.objects.create(**student_record(serial, resignation_date=None, **overrides))
+
+
+def create_course(serial, **fields):
+    return Course.objects.create(serial_number=serial, course_name=f"Course {serial}", course_duration_hours=10, **fields)
+
+
+def create_enrolment(student, course, **fields):
+    fields = {'enrolment_date': date(2024, 1, 1), 'deadline': date(2024, 6, 1), 'status': 'Semester 1', **fields}
+    return CourseEnrolment.objects.create(
+        serial_number=f"{student.serial_number}_{course.serial_number}", student=student, course=course, **fields,
+    )
+
+
+def create_exam(serial, enrolment, total_marks, obtained_marks, exam_type='Quiz'):
+    return Exam.objects.create(
+        serial_number=serial, course_enrolment=enrolment, exam_type=exam_type, exam_date=date(2024, 2, 1),
+        total_marks=Decimal(total_marks), obtained_marks=Decimal(obtained_marks),
+    )
+
+
+def create_staff(username, *permissions):
+    user = User.objects.create_user(username, f"{username}@example.com", 'password', is_staff=True)
+    user.user_permissions.add(*Permission.objects.filter(content_type__app_label='core', codename__in=permissions))
+    return user
+
+
+class StatisticsTests(TestCase):
+    def setUp(self):
+        self.course = create_course('C1')
+        first = create_enrolment(create_student('S1'), self.course)
+        second = create_enrolment(create_student('S2'), self.course)
+        self.exams = [
+            create_exam('E1', first, '10', '7'),
+            create_exam('E2', second, '20', '5'),
+            create_exam('E3', first, '50', '50', exam_type='Practical'),
+            create_exam('E4', second, '40', '10', exam_type='Practical'),
+            # No total: result_in_percentage and percentages() both score 0.
+            create_exam('E5', second, '0', '0', exam_type='Practical'),
+        ]
+
+    def test_percentages_match_result_in_percentage(self):
+        for exam in self.exams:
+            columns = statistics.exam_columns(Exam.objects.filter(pk=exam.pk))
+            self.assertAlmostEqual(statistics.percentages(columns)[0], float(exam.result_in_percentage))
+
+    def test_summarize_matches_result_in_percentage(self):
+        expected = [float(exam.result_in_percentage) for exam in self.exams]
+        summary = statistics.summarize(statistics.exam_columns())
+        self.assertEqual(summary['count'], 5)
+        self.assertAlmostEqual(summary['mean'], sum(expected) / len(expected))
+        self.assertEqual((summary['min'], summary['max']), (0.0, 100.0))
+        self.assertAlmostEqual(summary['pass_rate'], 40.0)
+        self.assertEqual(sum(summary['histogram']['counts']), 5)
+        self.assertEqual(summary['by_exam_type']['Quiz']['count'], 2)
+        self.assertAlmostEqual(summary['by_exam_type']['Practical']['mean'], (100 + 25 + 0) / 3)
+        self.assertNotIn('normalized', summary)
+
+    def test_normalize_marks(self):
+        columns = statistics.exam_columns()
+        percentages = statistics.percentages(columns)
+        self.assertEqual(list(statistics.normalize_marks(columns, 'percentage')), list(percentages))
+
+        normalized = statistics.normalize_marks(columns, 'zscore')
+        for exam_type in ('Quiz', 'Practical'):
+            scores = normalized[columns.exam_type == exam_type]
+            self.assertAlmostEqual(scores.mean(), 0.0)
+            self.assertAlmostEqual(scores.std(), 1.0)
+        with self.assertRaises(ValueError):
+            statistics.normalize_marks(columns, 'rank')
+
+    def test_course_statistics_api(self):
+        url = f"/api/courses/{self.course.serial_number}/statistics/"
+        self.client.force_login(create_staff('staff'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(create_staff('viewer', 'view_exam'))
+        data = self.client.get(url).json()
+        self.assertEqual(data['statistics']['count'], 5)
+        self.assertNotIn('normalized', data['statistics'])
+        normalized = self.client.get(url, {'normalize': 'zscore'}).json()['statistics']['normalized']
+        self.assertEqual((normalized['method'], normalized['count']), ('zscore', 5))
+        self.assertAlmostEqual(normalized['mean'], 0.0)
+        self.assertEqual(self.client.get(url, {'normalize': 'rank'}).status_code, 400)
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        self.user = create_staff('staff', 'view_exam')
+        self.backend = backends.CachedModelBackend()
+
+    def fresh_user(self):
+        # A new instance, so Django's per-request permission cache is empty.
+        return User.objects.get(pk=self.user.pk)
+
+    def revoke_without_signals(self):
+        # As another server process would: this process gets no signal.
+        User.user_permissions.through.objects.filter(user=self.user).delete()
+
+    def test_nothing_cached_with_a_process_local_cache(self):
+        self.assertFalse(backends.caches_auth())
+        self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        self.assertTrue(self.backend.has_perm(self.fresh_user(), 'core.view_exam'))
+        self.assertIsNone(backends.cache.get(backends.user_cache_key(self.user.pk)))
+        self.assertIsNone(backends.cache.get(backends.permissions_cache_key(self.user.pk)))
+
+        self.revoke_without_signals()
+        self.assertFalse(self.backend.has_perm(self.fresh_user(), 'core.view_exam'))
+
+    def test_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            self.assertTrue(backends.caches_auth())
+            self.backend.get_user(self.user.pk)
+            self.assertTrue(self.backend.has_perm(self.fresh_user(), 'core.view_exam'))
+            with self.assertNumQueries(0):
+                user = self.backend.get_user(self.user.pk)
+                self.assertTrue(self.backend.has_perm(user, 'core.view_exam'))
+
+            # Changes made through the ORM invalidate the cache.
+            self.user.user_permissions.clear()
+            self.assertFalse(self.backend.has_perm(self.fresh_user(), 'core.view_exam'))
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+class SyncModelTests(TestCase):
+    def sync(self, records, deactivate_missing=False):
+        return roster.sync_model(roster.STUDENT_SPEC, records, deactivate_missing)
+
+    def test_creates_updates_and_skips_unchanged(self):
+        result = self.sync([student_record('R1'), student_record('R2')])
+        self.assertEqual(result.created, ['R1', 'R2'])
+
+        result = self.sync([student_record('R1'), student_record('R2', name='Renamed')])
+        self.assertEqual(result.created, [])
+        self.assertEqual(result.changes, {'R2': {'name': ('Student R2', 'Renamed')}})
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(Student.objects.get(serial_number='R2').name, 'Renamed')
+
+        result = self.sync([student_record('R1'), student_record('R2', name='Renamed')])
+        self.assertEqual((result.created, result.changes, result.unchanged), ([], {}, 2))
+
+    def test_deactivates_missing_records(self):
+        self.sync([student_record('R1'), student_record('R2')])
+        result = self.sync([student_record('R1')], deactivate_missing=True)
+        self.assertEqual(result.deactivated, ['R2'])
+        r2 = Student.objects.get(serial_number='R2')
+        self.assertEqual(r2.status, 'Inactive')
+        self.assertEqual(r2.sync_fingerprint, '')
+
+        # Already inactive records are not reported again.
+        result = self.sync([student_record('R1')], deactivate_missing=True)
+        self.assertEqual(result.deactivated, [])
+
+    def test_reactivates_readded_record(self):
+        self.sync([student_record('R1'), student_record('R2')])
+        self.sync([student_record('R1')], deactivate_missing=True)
+
+        result = self.sync([student_record('R1'), student_record('R2')], deactivate_missing=True)
+        self.assertEqual(result.changes, {'R2': {'status': ('Inactive', 'Active')}})
+        self.assertEqual(result.deactivated, [])
+        self.assertEqual(Student.objects.get(serial_number='R2').status, 'Active')
+
+    def test_missing_records_are_kept_without_deactivate_missing(self):
+        self.sync([student_record('R1'), student_record('R2')])
+        result = self.sync([student_record('R1')])
+        self.assertEqual(result.deactivated, [])
+        self.assertEqual(Student.objects.get(serial_number='R2').status, 'Active')
+
+
+class SerialNumberAdminTests(TestCase):
+    def setUp(self):
+        self.other = create_student('OTHER')
+        # A numeric serial number equal to another student's primary key.
+        self.student = create_student(str(self.other.pk))
+        self.enrolment = create_enrolment(self.student, create_course('C1'))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def assertBreadcrumbLinksToSerialNumber(self, response):
+        self.assertContains(response, f'&rsaquo; <a href="{self.url("change")}">{self.student.name}</a>')
+
+    def url(self, action, key=None):
+        return f"/admin/core/student/{quote(self.student.serial_number if key is None else key)}/{action}/"
+
+    def test_change_view_looks_up_the_serial_number_only(self):
+        # The URL id is also the other student's primary key.
+        response = self.client.get(self.url('change'))
+        self.assertEqual(response.context['original'], self.student)
+        self.assertContains(response, f'href="{self.url("history")}"')
+        self.assertContains(response, f'href="{self.url("delete")}"')
+        # Primary keys are not accepted in place of serial numbers.
+        response = self.client.get(self.url('change', self.student.pk))
+        self.assertRedirects(response, '/admin/')
+
+    def test_primary_key_redirect(self):
+        for action in ('change', 'history', 'delete'):
+            response = self.client.get(f"/admin/core/student/id/{self.student.pk}/{action}/")
+            self.assertRedirects(response, self.url(action), fetch_redirect_response=False)
+        response = self.client.get(f"/admin/core/student/id/{self.student.pk}/change/", {'_to_field': 'id', '_popup': '1'})
+        self.assertRedirects(response, f"{self.url('change')}?_popup=1", fetch_redirect_response=False)
+        self.assertEqual(self.client.get(f"/admin/core/student/id/{self.student.pk}/export/").status_code, 404)
+        self.assertEqual(self.client.get(f"/admin/core/student/id/{self.student.serial_number}x/change/").status_code, 404)
+
+    def test_foreign_key_widget_links_through_the_primary_key_redirect(self):
+        response = self.client.get(f"/admin/core/courseenrolment/{quote(self.enrolment.serial_number)}/change/")
+        self.assertContains(response, '/admin/core/student/id/__fk__/change/')
+
+    def test_add_and_continue_redirects_to_the_serial_number(self):
+        response = self.client.post('/admin/core/course/add/', {
+            'course_name': 'New course', 'course_duration_hours': 5, '_continue': 'Save',
+        })
+        course = Course.objects.get(course_name='New course')
+        self.assertRedirects(response, f"/admin/core/course/{course.serial_number}/change/")
+        message = str(list(response.wsgi_request._messages)[0])
+        self.assertIn(f'href="/admin/core/course/{course.serial_number}/change/"', message)
+
+    def test_delete_view(self):
+        response = self.client.get(self.url('delete'))
+        self.assertBreadcrumbLinksToSerialNumber(response)
+        self.assertContains(response, f'Student: <a href="{self.url("change")}">')
+        self.assertContains(response, f'href="/admin/core/courseenrolment/{quote(self.enrolment.serial_number)}/change/"')
+        self.client.post(self.url('delete'), {'post': 'yes'})
+        self.assertFalse(Student.objects.filter(pk=self.student.pk).exists())
+        self.assertTrue(Student.objects.filter(pk=self.other.pk).exists())
+
+    def test_history_view_lists_the_objects_log_entries(self):
+        self.client.post(self.url('change'), {
+            **student_record(self.student.serial_number, name='Renamed', resignation_date=''),
+            '_save': 'Save',
+        })
+        self.assertEqual(LogEntry.objects.get().object_id, str(self.student.pk))
+        response = self.client.get(self.url('history'))
+        self.assertEqual([entry.object_id for entry in response.context['action_list']], [str(self.student.pk)])
+        self.student.refresh_from_db()
+        self.assertBreadcrumbLinksToSerialNumber(response)
+        self.assertEqual(self.client.get(self.url('history', 'OTHER')).context['action_list'].paginator.count, 0)
+
+
+class CohortEnrolmentActionTests(TestCase):
+    def setUp(self):
+        self.course = create_course('C1')
+        self.students = [create_student(f"S{i}") for i in range(3)]
+        create_enrolment(self.students[0], self.course)
+
+    def post_action(self, user):
+        self.client.force_login(user)
+        return self.client.post('/admin/core/student/', {
+            'action': 'enrol_in_course',
+            '_selected_action': [student.pk for student in self.students],
+            'apply': 'Enrol',
+            'course': self.course.pk,
+            'enrolment_date': '2024-01-01',
+            'deadline': '2024-06-01',
+            'status': 'Semester 1',
+            'active_status': 'Active',
+        }, follow=True)
+
+    def test_view_only_staff_cannot_enrol(self):
+        response = self.post_action(create_staff('viewer', 'view_student'))
+        self.assertEqual(CourseEnrolment.objects.count(), 1)
+        self.assertNotContains(response, 'value="enrol_in_course"')
+
+    def test_reports_created_and_skipped_students(self):
+        response = self.post_action(create_staff('registrar', 'view_student', 'add_courseenrolment'))
+        self.assertContains(response, f"Enrolled 2 students in {self.course}; skipped 1 already enrolled.")
+        self.assertEqual(
+            sorted(CourseEnrolment.objects.values_list('serial_number', flat=True)),
+            ['S0_C1', 'S1_C1', 'S2_C1'],
+        )
+
+
+class DashboardQueryTests(TestCase):
+    # Session, user, user and group permissions, eight dashboard queries and "My actions".
+    COLD_QUERIES = 13
+
+    def setUp(self):
+        create_course('C1')
+        self.staff = create_staff(
+            'staff', 'view_student', 'view_course', 'view_courseenrolment', 'view_exam', 'view_job',
+        )
+
+    def assertIndexQueries(self, cold, warm):
+        self.client.force_login(self.staff)
+        cache.clear()
+        with self.assertNumQueries(cold):
+            self.assertContains(self.client.get('/admin/'), 'C1')
+        with self.assertNumQueries(warm):
+            self.assertContains(self.client.get('/admin/'), 'C1')
+
+    def test_warm_index_only_loads_the_user_with_a_local_cache(self):
+        # The user and their user and group permissions are looked up on every request.
+        self.assertIndexQueries(cold=self.COLD_QUERIES, warm=3)
+
+    def test_warm_index_runs_no_queries_with_a_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            self.assertIndexQueries(cold=self.COLD_QUERIES, warm=0)
+
+
+class ChangesSinceTests(TestCase):
+    def setUp(self):
+        roster.sync_model(roster.STUDENT_SPEC, [student_record(f"R{i}") for i in range(5)])
+        # Equal timestamps, older than the safety window, so paging has to
+        # fall back on the id to order records.
+        self.updated_at = timezone.now() - timedelta(minutes=5)
+        Student.objects.update(updated_at=self.updated_at)
+
+    def page_through(self, limit):
+        serials, cursor = [], None
+        while True:
+            page = changefeed.changes_since(Student, cursor=cursor, limit=limit)
+            serials += [change['serial_number'] for change in page['changes']]
+            cursor = page['cursor']
+            if not page['has_more']:
+                return serials, cursor
+
+    def test_pages_through_every_record_once(self):
+        serials, _ = self.page_through(limit=2)
+        self.assertEqual(serials, [f"R{i}" for i in range(5)])
+
+    def test_cursor_returns_only_later_changes_and_deletions(self):
+        _, cursor = self.page_through(limit=2)
+        page = changefeed.changes_since(Student, cursor=cursor)
+        self.assertEqual((page['changes'], page['deletions'], page['has_more']), ([], [], False))
+
+        Student.objects.filter(serial_number='R1').update(updated_at=self.updated_at + timedelta(minutes=1))
+        Student.objects.get(serial_number='R3').delete()
+        page = changefeed.changes_since(Student, cursor=cursor)
+        self.assertEqual([change['serial_number'] for change in page['changes']], ['R1'])
+        self.assertEqual([deletion['serial_number'] for deletion in page['deletions']], ['R3'])
+
+    def test_deleting_a_course_head_marks_their_courses_changed(self):
+        course = create_course('C1', course_head=Student.objects.get(serial_number='R2'))
+        Course.objects.update(updated_at=self.updated_at)
+        cursor = changefeed.changes_since(Course)['cursor']
+
+        Student.objects.get(serial_number='R2').delete()
+        course.refresh_from_db()
+        self.assertIsNone(course.course_head)
+        self.assertGreater(course.updated_at, self.updated_at)
+        Course.objects.update(updated_at=F('updated_at') - timedelta(minutes=1))
+        page = changefeed.changes_since(Course, cursor=cursor)
+        self.assertEqual([(change['serial_number'], change['course_head_id']) for change in page['changes']], [('C1', None)])
+
+    def test_recent_changes_are_held_back(self):
+        Student.objects.filter(serial_number='R4').update(updated_at=timezone.now())
+        serials, _ = self.page_through(limit=10)
+        self.assertEqual(serials, ['R0', 'R1', 'R2', 'R3'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(changefeed.ValidationError):
+            changefeed.changes_since(Student, cursor='not-a-cursor')
+
+
+@jobs.handler('test_noop')
+def noop(context):
+    pass
+
+
+class JobQueueTests(TestCase):
+    def test_claims_highest_priority_first(self):
+        low = jobs.enqueue('test_noop', priority=0)
+        high = jobs.enqueue('test_noop', priority=5)
+        claimed = jobs.claim_next('worker-1')
+        self.assertEqual(claimed.pk, high.pk)
+        self.assertEqual((claimed.status, claimed.worker, claimed.attempts), ('Running', 'worker-1', 1))
+        self.assertEqual(jobs.claim_next('worker-1').pk, low.pk)
+        self.assertIsNone(jobs.claim_next('worker-1'))
+
+    def test_skips_jobs_not_yet_due(self):
+        jobs.enqueue('test_noop', run_after=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(jobs.claim_next('worker-1'))
+
+    @override_settings(TMS_JOB_CONCURRENCY={'test_noop': 1})
+    def test_concurrency_limit(self):
+        jobs.enqueue('test_noop')
+        jobs.enqueue('test_noop')
+        first = jobs.claim_next('worker-1')
+        self.assertIsNone(jobs.claim_next('worker-2'))
+        jobs.run_job(first)
+        self.assertIsNotNone(jobs.claim_next('worker-2'))
+
+    @override_settings(TMS_JOB_CONCURRENCY={'test_noop': 1})
+    def test_concurrency_limit_holds_when_running_count_is_stale(self):
+        jobs.enqueue('test_noop')
+        jobs.enqueue('test_noop')
+        jobs.claim_next('worker-1')
+        # Another worker counted the running jobs before worker-1 claimed its job.
+        with mock.patch.object(jobs, 'blocked_kinds', return_value=set()):
+            self.assertIsNone(jobs.claim_next('worker-2'))
+        self.assertEqual(Job.objects.filter(status='Running').count(), 1)
+
+    @override_settings(TMS_JOB_RETRY_BACKOFF_SECONDS=10)
+    def test_record_failure_retries_with_backoff_then_fails(self):
+        jobs.enqueue('test_noop', max_attempts=2)
+        job = jobs.claim_next('worker-1')
+        before = timezone.now()
+        jobs.record_failure(job, 'first error')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('Queued', 'first error'))
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job = jobs.claim_next('worker-1')
+        self.assertEqual(job.attempts, 2)
+        jobs.record_failure(job, 'second error')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('Failed', 'second error'))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_requeue_stale_spares_jobs_with_a_heartbeat(self):
+        jobs.enqueue('test_noop')
+        jobs.enqueue('test_noop')
+        stale, alive = jobs.claim_next('worker-1'), jobs.claim_next('worker-1')
+        Job.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        jobs.heartbeat([alive.pk])
+        self.assertEqual(jobs.requeue_stale(timeout=600), 1)
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, 'Queued')
+        self.assertEqual(Job.objects.get(pk=alive.pk).status, 'Running')
+
+
+class BackgroundExportTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        create_student('S1')
+        create_student('S2', status='Inactive')
+        self.checked_pk = create_student('S3').pk
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def export(self, url, **data):
+        self.client.post(url, {'action': 'export_as_csv_in_background', **data})
+        job = Job.objects.latest('pk')
+        jobs.run_job(jobs.claim_next('worker-1'))
+        job.refresh_from_db()
+        with job.result_file.open('r') as f:
+            serials = [line.split(',')[1] for line in f.read().splitlines()[1:]]
+        return job.payload, serials
+
+    def test_exports_selected_records(self):
+        pks = list(Student.objects.filter(serial_number__in=['S1', 'S2']).values_list('pk', flat=True))
+        payload, serials = self.export('/admin/core/student/', _selected_action=pks)
+        self.assertEqual(sorted(payload['pks']), sorted(pks))
+        self.assertEqual(serials, ['S1', 'S2'])
+
+    def test_select_across_stores_the_changelist_filters(self):
+        payload, serials = self.export('/admin/core/student/?status__exact=Active', select_across='1', _selected_action=self.checked_pk)
+        self.assertEqual(payload, {'model': 'student', 'changelist_filters': 'status__exact=Active'})
+        self.assertEqual(serials, ['S1', 'S3'])
+
+    def test_select_across_without_filters_exports_everything(self):
+        payload, serials = self.export('/admin/core/student/', select_across='1', _selected_action=self.checked_pk)
+        self.assertEqual(payload, {'model': 'student'})
+        self.assertEqual(serials, ['S1', 'S2', 'S3'])
+
+    def test_only_the_creator_and_superusers_can_download_results(self):
+        creator = create_staff('creator', 'view_student', 'view_job')
+        self.client.force_login(creator)
+        self.client.post('/admin/core/student/', {
+            'action': 'export_as_csv_in_background', '_selected_action': [self.checked_pk],
+        })
+        job = Job.objects.get()
+        jobs.run_job(jobs.claim_next('worker-1'))
+        url = f"/admin/core/job/{job.pk}/download/"
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_login(create_staff('colleague', 'view_job'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.get(username='admin'))
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('courses/<str:serial_number>/statistics/', views.course_statistics, name='course_statistics'),
+    path('changes/<str:model_name>/', views.changes, name='changes'),
+]
@@ -1,3 +1,78 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 
-# Create your views here.
+from . import changefeed, statistics
+from .models import Course
+from .routers import replica_read_view
+
+
+@staff_member_required
+@replica_read_view
+def course_statistics(request, serial_number):
+    """
+    Grade distribution for a single course as JSON.
+
+    Accepts optional ``bins``, ``include_inactive`` and ``normalize``
+    (percentage or zscore, see statistics.normalize_marks) query parameters.
+    """
+    if not request.user.has_perm('core.view_exam'):
+        return JsonResponse({'error': 'You do not have permission to view exams.'}, status=403)
+    course = get_object_or_404(Course, serial_number=serial_number)
+    try:
+        bins = min(max(int(request.GET.get('bins', 10)), 1), 100)
+    except ValueError:
+        bins = 10
+    include_inactive = request.GET.get('include_inactive') in ('1', 'true')
+    normalize = request.GET.get('normalize') or None
+    if normalize is not None and normalize not in statistics.NORMALIZATION_METHODS:
+        return JsonResponse(
+            {'error': f"Unknown normalize method; choose from {', '.join(statistics.NORMALIZATION_METHODS)}."},
+            status=400,
+        )
+    summary = statistics.course_statistics(
+        course, bins=bins, include_inactive=include_inactive, normalize=normalize,
+    )
+    return JsonResponse({
+        'course': course.serial_number,
+        'course_name': course.course_name,
+        'pass_percentage': statistics.PASS_PERCENTAGE,
+        'statistics': summary,
+    })
+
+
+@staff_member_required
+@replica_read_view
+def changes(request, model_name):
+    """
+    Incremental change feed for one core model as JSON.
+
+    Pass the ``cursor`` returned by the previous call, or ``since`` (an ISO
+    datetime) to start from a point in time; ``limit`` caps the batch size.
+    """
+    try:
+        model = changefeed.get_feed_model(model_name)
+    except ValidationError as e:
+        return JsonResponse({'error': '; '.join(e.messages)}, status=400)
+    if not request.user.has_perm(f"{model._meta.app_label}.view_{model._meta.model_name}"):
+        return JsonResponse(
+            {'error': f"You do not have permission to view {model._meta.verbose_name_plural}."}, status=403
+        )
+    try:
+        since = request.GET.get('since')
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                raise ValidationError('Invalid since datetime.')
+        batch = changefeed.changes_since(
+            model,
+            cursor=request.GET.get('cursor'),
+            since=since,
+            limit=request.GET.get('limit', changefeed.DEFAULT_LIMIT),
+        )
+    except (ValidationError, ValueError) as e:
+        message = '; '.join(e.messages) if isinstance(e, ValidationError) else str(e)
+        return JsonResponse({'error': message}, status=400)
+    return JsonResponse(batch)